@@ -0,0 +1,77 @@
+"""
+Cards parsed per second for each card extractor, and for the 'bs4' one with each HTML parser engine,
+checking that all of them produce the same products.
+
+Run from the repository root: PYTHONPATH=src python -m benchmarks.card_extractors
+"""
+
+from time import perf_counter
+
+from rich import print
+
+from app.consts import CardExtractor, HtmlParserEngine
+from app.extractor import extract_card_fields
+from app.matcher import get_query_matcher
+from app.models import Product, Query
+from app.parser import parse_product
+from benchmarks.corpus import load_cards, load_cards_corpus
+
+CORPUS_SIZE = 2_000
+MATCHER = get_query_matcher(Query(search_query="довлатов заповедник", title_query=None, description_query=None))
+
+# extractors with HTML parser engines; the 'xpath' one always parses with lxml
+VARIANTS = (
+    *((CardExtractor.BS4, engine) for engine in HtmlParserEngine),
+    (CardExtractor.XPATH, HtmlParserEngine.LXML),
+)
+REFERENCE_VARIANT = (CardExtractor.BS4, HtmlParserEngine.HTML_PARSER)
+
+
+def _parse_cards(cards: list[str], extractor: CardExtractor, html_parser: HtmlParserEngine) -> list[Product]:
+    return [
+        parse_product(card_fields, matcher=MATCHER)
+        for card in cards
+        if (card_fields := extract_card_fields(card, extractor, html_parser))
+    ]
+
+
+def _get_fields(product: Product) -> tuple:
+    return (
+        product.title,
+        product.description,
+        product.url,
+        product.title_price,
+        product.description_info,
+        product.is_query_in_title,
+    )
+
+
+def _get_label(extractor: CardExtractor, html_parser: HtmlParserEngine) -> str:
+    return f"{extractor} ({html_parser})" if extractor == CardExtractor.BS4 else extractor
+
+
+def _check_extractors() -> None:
+    cards = list(load_cards().values())
+    reference = [_get_fields(product) for product in _parse_cards(cards, *REFERENCE_VARIANT)]
+    for variant in VARIANTS:
+        if [_get_fields(product) for product in _parse_cards(cards, *variant)] != reference:
+            raise AssertionError(
+                f"Products parsed with '{_get_label(*variant)}' differ from '{_get_label(*REFERENCE_VARIANT)}' ones"
+            )
+
+
+def main() -> None:
+    _check_extractors()
+
+    cards = load_cards_corpus(CORPUS_SIZE)
+
+    print(f"[bold]Parsing {len(cards)} cards[/bold]")
+    for variant in VARIANTS:
+        start_time = perf_counter()
+        _parse_cards(cards, *variant)
+        elapsed = perf_counter() - start_time
+        print(f"  {_get_label(*variant):<18} [bold green]{len(cards) / elapsed:8.0f}[/bold green] cards/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from pathlib import Path
+
+CARDS_DIR = Path(__file__).parent / "fixtures" / "cards"
+
+
+def load_cards() -> dict[str, str]:
+    """Load saved Avito card HTML by fixture name."""
+    return {path.stem: path.read_text(encoding="utf-8").strip() for path in sorted(CARDS_DIR.glob("*.html"))}
+
+
+def load_cards_corpus(size: int) -> list[str]:
+    """Repeat saved cards up to the requested corpus size."""
+    cards = list(load_cards().values())
+    return [cards[i % len(cards)] for i in range(size)]
@@ -0,0 +1,188 @@
+"""
+Description lines parsed per second by the price extractor, compared to the per-character scan it replaced,
+checking that both of them find the same prices and statuses on long multi-item descriptions
+and on random lines made of numbers, unit and currency symbols.
+
+Run from the repository root: PYTHONPATH=src python -m benchmarks.price_extractor
+"""
+
+from random import Random
+from time import perf_counter
+
+from rich import print
+
+from app.consts import Symbols
+from app.extractor import extract_card_fields
+from app.matcher import normalize
+from app.models import DescriptionLine, ParsedStatus
+from app.parser import parse_description_line
+from benchmarks.corpus import load_cards
+
+DESCRIPTIONS_NUMBER = 200
+LINES_PER_DESCRIPTION = 150  # long lists of items, like bookshelves sold at once
+SEED = 0
+FUZZ_LINES_NUMBER = 50_000
+
+ITEM_TEMPLATES = (
+    "{n}. Довлатов С. Заповедник, {year} г., {price} р",
+    "{n}) Бродский. Часть речи - {price}₽",
+    "{n} Пушкин, собрание сочинений в {volumes} томах {price} рублей продано",
+    "{n}. Ахматова, {pages} c., вес {weight} гр, цена {price}",
+    "Набоков, Лолита ({year}) - {price} руб. бронь",
+    "{n}. Платонов, Котлован, {pages} c. {price}",
+    "Цветаева, избранное, {price}р ❌",
+)
+
+
+def _parse_description_line_by_chars(
+    line: str,
+    *,
+    min_price: int | None = None,
+    max_price: int | None = None,
+) -> DescriptionLine:
+    """Reference implementation, that scans the line char by char and compares every symbol at each stop."""
+    price, maybe_price, is_now_parsing_price = "", "", False
+
+    for i, char in enumerate(line):
+        if char.isdigit():
+            price += char
+            is_now_parsing_price = True
+
+        elif is_now_parsing_price:
+            if any(symbol == line[i : i + len(symbol)] for symbol in Symbols.NOT_RUB.values):
+                price, is_now_parsing_price = "", False
+                continue
+            elif any(symbol == line[i : i + len(symbol)] for symbol in Symbols.RUB.values):
+                break
+            else:
+                maybe_price = price
+                price, is_now_parsing_price = "", False
+
+        else:
+            price, is_now_parsing_price = "", False
+
+    def validate_price(v: str | int | None) -> int | None:
+        v = int(v) if v else None
+        if v and (not min_price or v >= min_price) and (not max_price or v <= max_price):
+            return v
+        return None
+
+    price = validate_price(price) or validate_price(maybe_price)
+
+    status = next(
+        (
+            status
+            for status, symbols in {
+                ParsedStatus.SOLD: Symbols.SOLD.values,
+                ParsedStatus.BOOKED: Symbols.BOOKED.values,
+            }.items()
+            if any(sym in line for sym in symbols)
+        ),
+        ParsedStatus.OK if price else ParsedStatus.NOT_FOUND,
+    )
+
+    return DescriptionLine(price=price, status=status)
+
+
+def _build_descriptions() -> list[list[str]]:
+    """Normalized lines of multi-item descriptions, made of generated items and lines of saved cards."""
+    random = Random(SEED)
+    card_lines = [
+        line
+        for card in load_cards().values()
+        if (card_fields := extract_card_fields(card))
+        for line in normalize(card_fields.description).splitlines()
+        if line.strip()
+    ]
+
+    def generate_line(n: int) -> str:
+        if card_lines and random.random() < 0.2:
+            return random.choice(card_lines)
+        template = random.choice(ITEM_TEMPLATES)
+        return normalize(
+            template.format(
+                n=n,
+                year=random.randint(1950, 2024),
+                price=random.randint(50, 15_000),
+                volumes=random.randint(2, 12),
+                pages=random.randint(100, 900),
+                weight=random.randint(200, 2_000),
+            )
+        )
+
+    return [[generate_line(n) for n in range(1, LINES_PER_DESCRIPTION + 1)] for _ in range(DESCRIPTIONS_NUMBER)]
+
+
+# pieces of random lines: numbers are mostly put right next to unit and currency symbols or the words
+# they start, like "г" of "года" or "р" of "руб.", where the extractors could disagree
+FUZZ_TOKENS = (
+    *Symbols.RUB.value,
+    *Symbols.NOT_RUB.value,
+    *Symbols.SOLD.value,
+    *Symbols.BOOKED.value,
+    "года",
+    "грамм",
+    "кгб",
+    "см",
+    "руб.",
+    "р.",
+    "с",
+    "шт",
+    "цена",
+    "том",
+    "-",
+    ",",
+    ".",
+    "/",
+    "(",
+    ")",
+    ":",
+)
+
+
+def _build_fuzz_lines() -> list[str]:
+    """Normalized random lines of numbers mixed with symbols, with and without spaces between them."""
+    random = Random(SEED)
+
+    def generate_piece() -> str:
+        if random.random() < 0.4:
+            return str(random.randint(0, 10 ** random.randint(1, 6)))
+        return random.choice(FUZZ_TOKENS)
+
+    def generate_line() -> str:
+        pieces = [generate_piece() for _ in range(random.randint(1, 12))]
+        return "".join(piece + random.choice(("", "", " ", "  ")) for piece in pieces)
+
+    return [normalize(generate_line()) for _ in range(FUZZ_LINES_NUMBER)]
+
+
+def _check_extractor(lines: list[str]) -> None:
+    for price_range in ((None, None), (300, 5_000)):
+        min_price, max_price = price_range
+        for line in lines:
+            expected = _parse_description_line_by_chars(line, min_price=min_price, max_price=max_price)
+            actual = parse_description_line(line, min_price=min_price, max_price=max_price)
+            if actual != expected:
+                raise AssertionError(f"Line {line!r} is parsed as {actual}, expected {expected}")
+
+
+def main() -> None:
+    descriptions = _build_descriptions()
+    lines = [line for description in descriptions for line in description]
+    _check_extractor(lines)
+    _check_extractor(_build_fuzz_lines())
+
+    print(f"[bold]Parsing {len(descriptions)} descriptions of {LINES_PER_DESCRIPTION} lines[/bold]")
+    for label, parse_line in (
+        ("by chars", _parse_description_line_by_chars),
+        ("regex", parse_description_line),
+    ):
+        start_time = perf_counter()
+        for line in lines:
+            parse_line(line)
+        elapsed = perf_counter() - start_time
+        print(f"  {label:<10} [bold green]{len(lines) / elapsed:9.0f}[/bold green] lines/s")
+
+
+if __name__ == "__main__":
+    main()
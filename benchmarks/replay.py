@@ -0,0 +1,112 @@
+"""
+End-to-end throughput of the parse -> filter -> sort -> present pipeline on replayed search pages.
+
+Pages are replayed as fast as possible from an archive recorded with '--archive' option of search commands,
+so no browser or network is involved. Without an archive, one is made of the saved cards.
+Every recorded search is replayed with its own price range and sort order (e.g. of '--url-filters' searches).
+
+Run from the repository root: PYTHONPATH=src python -m benchmarks.replay [ARCHIVE_PATH]
+"""
+
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from time import perf_counter
+
+from rich import print
+
+from app.cli.parsers import parse_params
+from app.consts import SearchSort
+from app.filters import filter_products
+from app.models import (
+    FetchEngine,
+    Product,
+    ProductRequest,
+    Query,
+    ReprMode,
+    SortBy,
+    SortOrder,
+)
+from app.presenter import present
+from app.scraper.archive import PageRecorder, get_page_archive, mount_page_archive
+from app.scraper.driver import mount_interface_pool
+from app.scraper.search import Search
+from app.services import scrape_grouped_products
+from app.sorters import sort_products
+from benchmarks.corpus import load_cards_corpus
+
+PAGES_NUMBER = 20
+CARDS_PER_PAGE = 50
+QUERY = "довлатов заповедник"
+
+_SORTS_MAPPING: dict[SearchSort, tuple[SortBy, SortOrder]] = {
+    SearchSort.PRICE_ASC: (SortBy.PRICE, SortOrder.ASC),
+    SearchSort.PRICE_DESC: (SortBy.PRICE, SortOrder.DESC),
+}
+
+
+def _make_archive(path: Path) -> None:
+    cards = load_cards_corpus(PAGES_NUMBER * CARDS_PER_PAGE)
+
+    recorder = PageRecorder(path)
+    for page_number in range(1, PAGES_NUMBER + 1):
+        page_cards = cards[(page_number - 1) * CARDS_PER_PAGE : page_number * CARDS_PER_PAGE]
+        recorder.record(Search(QUERY), page_number, page_cards, fetch_time=0.0)
+    recorder.record(Search(QUERY), PAGES_NUMBER + 1, [], fetch_time=0.0)
+    recorder.close()
+
+
+def _build_request(search: Search, template: ReprMode) -> ProductRequest:
+    """Build a request, that filters and sorts products like the search does."""
+    sort_by, sort_order = _SORTS_MAPPING.get(search.sort, (SortBy.PAGE, SortOrder.ASC))
+    return ProductRequest(
+        query=Query(search_query=search.query, title_query=None, description_query=None),
+        params=parse_params(
+            min_price=search.min_price,
+            max_price=search.max_price,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            template=template,
+        ),
+    )
+
+
+def _search(search: Search, request: ProductRequest) -> list[Product]:
+    (products,) = scrape_grouped_products([request], pipelined=False, engine=FetchEngine.REPLAY, search=search)
+    products = filter_products(products, filter_params=request.params.filter_params)
+    products = sort_products(products, sort_params=request.params.sort_params)
+    present(products, mode=request.params.template)
+    return products
+
+
+def _run(archive_path: Path, template: ReprMode) -> None:
+    with mount_interface_pool(), mount_page_archive(archive_path, replay=True):
+        searches = get_page_archive().searches
+
+        start_time = perf_counter()
+        with redirect_stdout(StringIO()):
+            products_number = sum(len(_search(search, _build_request(search, template))) for search in searches)
+        elapsed = perf_counter() - start_time
+
+    print(
+        f"  {template:<12} [bold green]{products_number / elapsed:8.0f}[/bold green] products/s "
+        f"({products_number} products of {len(searches)} searches in {elapsed:.2f} s)"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        archive_path = Path(sys.argv[1])
+    else:
+        archive_path = Path(tempfile.mkdtemp()) / "archive.jsonl.gz"
+        _make_archive(archive_path)
+
+    print(f"[bold]Replaying {archive_path}[/bold]")
+    for template in (ReprMode.LIST, ReprMode.TABLE):
+        _run(archive_path, template)
+
+
+if __name__ == "__main__":
+    main()
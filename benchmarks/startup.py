@@ -0,0 +1,76 @@
+"""
+Cold-start import time of CLI commands, checked against time budgets.
+
+Run from the repository root: PYTHONPATH=src python -m benchmarks.startup
+Exits with code 1 when any budget is exceeded.
+"""
+
+import os
+import subprocess
+import sys
+from statistics import median
+from typing import NamedTuple
+
+from rich import print
+
+RUNS_NUMBER = 7
+
+
+class Scenario(NamedTuple):
+    name: str
+    code: str  # imports done by the command before it starts working
+    budget_ms: float | None  # None for scenarios tracked without a budget
+
+
+SCENARIOS = [
+    Scenario("--help", "import app.cli.commands", budget_ms=150),
+    Scenario("search-in-db", "import app.cli.commands, app.services", budget_ms=250),
+    Scenario("search-on-avito", "import app.cli.commands, app.services, app.scraper.getters", budget_ms=None),
+]
+
+
+def _measure_import_time_ms(code: str) -> float:
+    """Total cumulative time of top-level imports reported by 'python -X importtime'."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=os.environ | {"PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if len(name) - len(name.lstrip()) == 1:  # nested imports are indented by two more spaces
+            total_us += int(cumulative)
+
+    return total_us / 1000
+
+
+def main() -> None:
+    baseline_ms = median(_measure_import_time_ms("pass") for _ in range(RUNS_NUMBER))
+    print(f"[bold]Import time over interpreter start ({baseline_ms:.1f} ms), median of {RUNS_NUMBER} runs[/bold]")
+
+    is_over_budget = False
+    for scenario in SCENARIOS:
+        import_time_ms = median(_measure_import_time_ms(scenario.code) for _ in range(RUNS_NUMBER)) - baseline_ms
+
+        if scenario.budget_ms is None:
+            verdict = "[dim]no budget[/dim]"
+        elif import_time_ms <= scenario.budget_ms:
+            verdict = f"[green]within {scenario.budget_ms:.0f} ms budget[/green]"
+        else:
+            verdict = f"[bold red]over {scenario.budget_ms:.0f} ms budget[/bold red]"
+            is_over_budget = True
+
+        print(f"  {scenario.name:<16} [bold green]{import_time_ms:8.1f}[/bold green] ms  {verdict}")
+
+    if is_over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Micro-benchmarks of the hot paths of parsing and processing products at several corpus sizes,
+with machine-readable results, that can be compared to results of another build to catch regressions.
+
+Inputs are made of the saved cards, repeated up to the corpus size. They are built once per size and shared
+by all runs, as no case modifies them. Each case is run at least a few times and until enough time is measured,
+and the best time is reported.
+
+Run from the repository root: PYTHONPATH=src python -m benchmarks.suite [--sizes N ...] [--json PATH]
+    [--baseline PATH] [--tolerance FRACTION]
+Exits with code 1 when any case is slower than in the baseline by more than the tolerance.
+"""
+
+import gc
+import json
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from functools import cache
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, NamedTuple
+
+from rich import print
+
+from app.cli.parsers import parse_params
+from app.db.serializers import dict_to_product, product_to_dict
+from app.extractor import CardFields, extract_card_fields
+from app.filters import filter_products
+from app.matcher import get_query_matcher, normalize
+from app.models import Product, Query, SortBy, SortOrder
+from app.parser import parse_description, parse_description_line, parse_product
+from app.sorters import sort_products
+from benchmarks.corpus import load_cards
+
+SIZES = (1_000, 10_000, 100_000)
+MIN_REPEATS, MAX_REPEATS = 3, 100
+MIN_MEASURED_TIME = 1.0  # in seconds, fast cases on small corpora are repeated more to reduce noise
+TOLERANCE = 0.25  # allowed slowdown relative to the baseline
+
+MATCHER = get_query_matcher(Query(search_query="довлатов", title_query=None, description_query=None))
+PARAMS = parse_params(
+    min_price=300,
+    max_price=5_000,
+    include_unknown=False,
+    include_booked=False,
+    include_sold=False,
+    sort_by=SortBy.PRICE,
+    sort_order=SortOrder.ASC,
+)
+
+
+class Case(NamedTuple):
+    name: str
+    prepare: Callable[[int], Any]  # gets inputs of the corpus size from cached data, called before each run
+    run: Callable[[Any], object]
+
+
+class Result(NamedTuple):
+    case: str
+    size: int
+    seconds: float
+
+    @property
+    def items_per_second(self) -> float:
+        return self.size / self.seconds
+
+
+def _repeat[T](items: list[T], size: int) -> list[T]:
+    return [items[i % len(items)] for i in range(size)]
+
+
+@cache
+def _load_cards_fields() -> list[CardFields]:
+    # services cards are skipped by the extractor, like in scraping
+    return [card_fields for card in load_cards().values() if (card_fields := extract_card_fields(card))]
+
+
+@cache
+def _get_cards_fields(size: int) -> list[CardFields]:
+    return _repeat(_load_cards_fields(), size)
+
+
+@cache
+def _get_description_lines(size: int) -> list[str]:
+    return _repeat([line for card_fields in _load_cards_fields() for line in card_fields.description.split("\n")], size)
+
+
+@cache
+def _get_products(size: int) -> list[Product]:
+    return [parse_product(card_fields, matcher=MATCHER) for card_fields in _get_cards_fields(size)]
+
+
+@cache
+def _get_products_fields(size: int) -> list[dict[str, Any]]:
+    # prices and statuses are computed when a product is constructed, so only the given fields are passed
+    return [
+        {
+            "title": product.title,
+            "description": product.description,
+            "url": product.url,
+            "title_price": product.title_price,
+            "description_info": product.description_info,
+            "is_query_in_title": product.is_query_in_title,
+        }
+        for product in _get_products(size)
+    ]
+
+
+CASES = (
+    Case(
+        "parse_product",
+        prepare=_get_cards_fields,
+        run=lambda cards_fields: [parse_product(card_fields, matcher=MATCHER) for card_fields in cards_fields],
+    ),
+    Case(
+        "parse_description",
+        prepare=lambda size: [card_fields.description for card_fields in _get_cards_fields(size)],
+        run=lambda descriptions: [parse_description(description, matcher=MATCHER) for description in descriptions],
+    ),
+    Case(
+        "parse_description_line",
+        prepare=lambda size: [normalize(line) for line in _get_description_lines(size)],
+        run=lambda lines: [parse_description_line(line) for line in lines],
+    ),
+    Case(
+        "normalize",
+        prepare=_get_description_lines,
+        run=lambda lines: [normalize(line) for line in lines],
+    ),
+    Case(
+        "construct_product",
+        prepare=_get_products_fields,
+        run=lambda products_fields: [Product(**product_fields) for product_fields in products_fields],
+    ),
+    Case(
+        "filter_products",
+        prepare=_get_products,
+        run=lambda products: filter_products(products, filter_params=PARAMS.filter_params),
+    ),
+    Case(
+        "sort_products",
+        prepare=_get_products,
+        run=lambda products: sort_products(products, sort_params=PARAMS.sort_params),
+    ),
+    Case(
+        "serializers",
+        prepare=_get_products,
+        run=lambda products: [dict_to_product(product_to_dict(product)) for product in products],
+    ),
+)
+
+
+def _measure(case: Case, size: int) -> Result:
+    times: list[float] = []
+    while len(times) < MIN_REPEATS or (sum(times) < MIN_MEASURED_TIME and len(times) < MAX_REPEATS):
+        inputs = case.prepare(size)
+        gc.collect()
+        gc.disable()  # like in 'timeit', so collections of earlier garbage are not timed
+        try:
+            start_time = perf_counter()
+            case.run(inputs)
+            times.append(perf_counter() - start_time)
+        finally:
+            gc.enable()
+    return Result(case.name, size, min(times))
+
+
+def _get_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _dump_results(results: list[Result], path: Path) -> None:
+    data = {
+        "meta": {
+            "datetime": datetime.now().isoformat(timespec="seconds"),
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_repeats": MIN_REPEATS,
+            "min_measured_time": MIN_MEASURED_TIME,
+        },
+        "results": [
+            {
+                "case": result.case,
+                "size": result.size,
+                "seconds": result.seconds,
+                "items_per_second": result.items_per_second,
+            }
+            for result in results
+        ],
+    }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def _load_baseline(path: Path) -> dict[tuple[str, int], float]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {(result["case"], result["size"]): result["seconds"] for result in data["results"]}
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Micro-benchmarks of parsing and processing products.")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="corpus sizes, in items")
+    arg_parser.add_argument("--json", type=Path, help="file to write results to")
+    arg_parser.add_argument("--baseline", type=Path, help="results of another build to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, as a fraction")
+    args = arg_parser.parse_args()
+
+    baseline = _load_baseline(args.baseline) if args.baseline else {}
+
+    print("[bold]Items per second, best of repeated runs[/bold]")
+    results, is_regressed = [], False
+    for case in CASES:
+        for size in args.sizes:
+            result = _measure(case, size)
+            results.append(result)
+
+            baseline_seconds = baseline.get((case.name, size))
+            if baseline_seconds is None:
+                verdict = ""
+            elif result.seconds <= baseline_seconds * (1 + args.tolerance):
+                verdict = f"[green]{baseline_seconds / result.seconds:5.2f}x of baseline[/green]"
+            else:
+                verdict = f"[bold red]{baseline_seconds / result.seconds:5.2f}x of baseline, regressed[/bold red]"
+                is_regressed = True
+
+            print(f"  {case.name:<24} {size:>8}  [bold green]{result.items_per_second:10.0f}[/bold green]/s  {verdict}")
+
+    if args.json:
+        _dump_results(results, args.json)
+        print(f"[dim]Results are written to {args.json}[/dim]")
+
+    if is_regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,152 @@
 from datetime import datetime
+from pathlib import Path
 
-from typer import Typer
+from click import get_current_context
+from click.core import ParameterSource
+from typer import BadParameter, Typer
 
 from app.cli import defaults, opts, parsers
-from app.file_loader import load_request_entries_from_file
-from app.models import DatetimeRange, ProductRequest
-from app.scraper.driver import mount_interface
-from app.services import search_in_db as search_in_db_service_function
-from app.services import search_on_avito as search_on_avito_service_function
+from app.models import (
+    CacheMode,
+    DatetimeRange,
+    FetchEngine,
+    ProductRequest,
+    ReplaySpeed,
+)
+
+# Each command imports only the subsystems it uses, so '--help' and db queries do not load the browser stack.
 
 cli_app = Typer()
 
 
+def _is_option_passed(name: str) -> bool:
+    """Whether the option of the running command is set by the user, not left to its default."""
+    source = get_current_context().get_parameter_source(name)
+    return source in (ParameterSource.COMMANDLINE, ParameterSource.ENVIRONMENT)
+
+
+def _search_on_avito(
+    requests: list[ProductRequest],
+    *,
+    engine: FetchEngine,
+    workers: int,
+    parse_workers: int,
+    concurrency: int,
+    pipeline: bool,
+    cache_mode: CacheMode,
+    url_filters: bool,
+    incremental: bool,
+    stream: bool,
+    ndjson: Path | None,
+    archive: Path | None,
+    parse_cache: Path | None,
+    replay_speed: ReplaySpeed,
+    daemon: bool,
+) -> None:
+    from app.services import search_on_avito as search_on_avito_service_function
+    from app.services import (
+        search_on_avito_for_requests as search_on_avito_for_requests_service_function,
+    )
+    from app.services import stream_from_avito as stream_from_avito_service_function
+
+    cli_call_timestamp = datetime.now().replace(second=0, microsecond=0)
+
+    if concurrency:
+        # concurrent searches fetch pages over async HTTP and parse them after fetching
+        if _is_option_passed("engine") and engine != FetchEngine.HTTPX:
+            raise BadParameter(
+                f"'{engine}' engine can not be used with '--concurrency' option.", param_hint="'--engine'"
+            )
+        if _is_option_passed("pipeline") and pipeline:
+            raise BadParameter("Pipelining is not supported with '--concurrency' option.", param_hint="'--pipeline'")
+        if stream:
+            raise BadParameter("Streaming is not supported with '--concurrency' option.", param_hint="'--stream'")
+        if daemon:
+            raise BadParameter("Concurrent searches are not supported with '--daemon' option.", param_hint="'--daemon'")
+
+    if daemon:
+        if archive or engine == FetchEngine.REPLAY:
+            raise ValueError("Recording and replaying pages is not supported with '--daemon' option.")
+        if stream:
+            raise ValueError("Streaming is not supported with '--daemon' option.")
+        if parse_workers:
+            raise ValueError("Cards are parsed by the daemon, set '--parse-workers' option of 'run-daemon' command.")
+        if parse_cache:
+            raise ValueError("Cards are parsed by the daemon, set '--parse-cache' option of 'run-daemon' command.")
+
+        for request in requests:
+            search_on_avito_service_function(
+                request=request,
+                timestamp=cli_call_timestamp,
+                pipelined=pipeline,
+                engine=engine,
+                cache_mode=cache_mode,
+                url_filters=url_filters,
+                incremental=incremental,
+                via_daemon=True,
+                ndjson_path=ndjson,
+            )
+        return
+
+    from app.parse_cache import mount_parse_cache
+    from app.parse_pool import mount_parse_pool
+    from app.scraper.archive import mount_page_archive
+    from app.scraper.client import mount_client
+    from app.scraper.driver import mount_interface_pool
+
+    with (
+        mount_interface_pool(size=workers),
+        mount_client(),
+        mount_page_archive(archive, replay=(engine == FetchEngine.REPLAY), replay_speed=replay_speed),
+        mount_parse_pool(workers=parse_workers),
+        mount_parse_cache(parse_cache),
+    ):
+        if concurrency:
+            import asyncio
+
+            from app.services import (
+                search_on_avito_async as search_on_avito_async_service_function,
+            )
+
+            asyncio.run(
+                search_on_avito_async_service_function(
+                    requests=requests,
+                    timestamp=cli_call_timestamp,
+                    concurrency=concurrency,
+                    cache_mode=cache_mode,
+                    url_filters=url_filters,
+                    incremental=incremental,
+                    ndjson_path=ndjson,
+                )
+            )
+            return
+
+        if stream:
+            for request in requests:
+                stream_from_avito_service_function(
+                    request=request,
+                    timestamp=cli_call_timestamp,
+                    pipelined=pipeline,
+                    engine=engine,
+                    cache_mode=cache_mode,
+                    url_filters=url_filters,
+                    incremental=incremental,
+                    ndjson_path=ndjson,
+                )
+            return
+
+        search_on_avito_for_requests_service_function(
+            requests=requests,
+            timestamp=cli_call_timestamp,
+            pipelined=pipeline,
+            engine=engine,
+            cache_mode=cache_mode,
+            url_filters=url_filters,
+            incremental=incremental,
+            ndjson_path=ndjson,
+        )
+
+
 @cli_app.command()
 def search_on_avito(
     search_queries: opts.RequiredSearchQueries,
@@ -19,6 +154,20 @@ def search_on_avito(
     title_queries: opts.TitleQueries,
     description_queries: opts.DescriptionQueries,
     max_pages: opts.MaxPages = defaults.MAX_PAGES,
+    engine: opts.Engine = defaults.ENGINE,
+    workers: opts.Workers = defaults.WORKERS,
+    parse_workers: opts.ParseWorkers = defaults.PARSE_WORKERS,
+    concurrency: opts.Concurrency = defaults.CONCURRENCY,
+    pipeline: opts.Pipeline = defaults.PIPELINE,
+    cache_mode: opts.CacheMode = defaults.CACHE_MODE,
+    url_filters: opts.UrlFilters = defaults.URL_FILTERS,
+    incremental: opts.Incremental = defaults.INCREMENTAL,
+    stream: opts.Stream = defaults.STREAM,
+    ndjson: opts.Ndjson = defaults.NDJSON,
+    archive: opts.Archive = defaults.ARCHIVE,
+    parse_cache: opts.ParseCache = defaults.PARSE_CACHE,
+    replay_speed: opts.ReplaySpeed = defaults.REPLAY_SPEED,
+    daemon: opts.Daemon = defaults.DAEMON,
     min_price: opts.MinPrice = defaults.MIN_PRICE,
     max_price: opts.MaxPrice = defaults.MAX_PRICE,
     include_unknown: opts.IncludeUnknown = defaults.INCLUDE_UNKNOWN,
@@ -71,11 +220,23 @@ def search_on_avito(
         for i in range(len(search_queries))
     ]
 
-    cli_call_timestamp = datetime.now().replace(second=0, microsecond=0)
-
-    with mount_interface():
-        for request in requests:
-            search_on_avito_service_function(request=request, timestamp=cli_call_timestamp)
+    _search_on_avito(
+        requests,
+        engine=engine,
+        workers=workers,
+        parse_workers=parse_workers,
+        concurrency=concurrency,
+        pipeline=pipeline,
+        cache_mode=cache_mode,
+        url_filters=url_filters,
+        incremental=incremental,
+        stream=stream,
+        ndjson=ndjson,
+        archive=archive,
+        parse_cache=parse_cache,
+        replay_speed=replay_speed,
+        daemon=daemon,
+    )
 
 
 @cli_app.command()
@@ -83,6 +244,20 @@ def search_on_avito_from_file(
     file_path: opts.FilePath,
     *,
     max_pages: opts.MaxPages = defaults.MAX_PAGES,
+    engine: opts.Engine = defaults.ENGINE,
+    workers: opts.Workers = defaults.WORKERS,
+    parse_workers: opts.ParseWorkers = defaults.PARSE_WORKERS,
+    concurrency: opts.Concurrency = defaults.CONCURRENCY,
+    pipeline: opts.Pipeline = defaults.PIPELINE,
+    cache_mode: opts.CacheMode = defaults.CACHE_MODE,
+    url_filters: opts.UrlFilters = defaults.URL_FILTERS,
+    incremental: opts.Incremental = defaults.INCREMENTAL,
+    stream: opts.Stream = defaults.STREAM,
+    ndjson: opts.Ndjson = defaults.NDJSON,
+    archive: opts.Archive = defaults.ARCHIVE,
+    parse_cache: opts.ParseCache = defaults.PARSE_CACHE,
+    replay_speed: opts.ReplaySpeed = defaults.REPLAY_SPEED,
+    daemon: opts.Daemon = defaults.DAEMON,
     min_price: opts.MinPrice = defaults.MIN_PRICE,
     max_price: opts.MaxPrice = defaults.MAX_PRICE,
     include_unknown: opts.IncludeUnknown = defaults.INCLUDE_UNKNOWN,
@@ -105,6 +280,8 @@ def search_on_avito_from_file(
 
     Other options provide fallback values for all params, when they are not provided in the file.
     """
+    from app.file_loader import load_request_entries_from_file
+
     requests = load_request_entries_from_file(
         file_path=file_path,
         fallback_params=parsers.parse_params(
@@ -123,11 +300,51 @@ def search_on_avito_from_file(
         ),
     )
 
-    cli_call_timestamp = datetime.now().replace(second=0, microsecond=0)
+    _search_on_avito(
+        requests,
+        engine=engine,
+        workers=workers,
+        parse_workers=parse_workers,
+        concurrency=concurrency,
+        pipeline=pipeline,
+        cache_mode=cache_mode,
+        url_filters=url_filters,
+        incremental=incremental,
+        stream=stream,
+        ndjson=ndjson,
+        archive=archive,
+        parse_cache=parse_cache,
+        replay_speed=replay_speed,
+        daemon=daemon,
+    )
 
-    with mount_interface():
-        for request in requests:
-            search_on_avito_service_function(request=request, timestamp=cli_call_timestamp)
+
+@cli_app.command()
+def run_daemon(
+    *,
+    workers: opts.Workers = defaults.WORKERS,
+    parse_workers: opts.ParseWorkers = defaults.PARSE_WORKERS,
+    parse_cache: opts.ParseCache = defaults.PARSE_CACHE,
+) -> None:
+    """
+    Run a daemon, that keeps browsers warm between calls of search commands.
+
+    Search commands called with '--daemon' option send their requests to it over a unix socket,
+    which path is set by AVITO_PARSER_DAEMON_SOCKET environment variable.
+    """
+    from app.daemon.server import run_daemon as run_daemon_service_function
+    from app.parse_cache import mount_parse_cache
+    from app.parse_pool import mount_parse_pool
+    from app.scraper.client import mount_client
+    from app.scraper.driver import mount_interface_pool
+
+    with (
+        mount_interface_pool(size=workers),
+        mount_client(),
+        mount_parse_pool(workers=parse_workers),
+        mount_parse_cache(parse_cache),
+    ):
+        run_daemon_service_function()
 
 
 @cli_app.command()
@@ -155,10 +372,7 @@ def search_in_db(
 
 
     """
-    try:
-        from app.db import get_products_from_db, get_requests_from_db
-    except ImportError:
-        raise ImportError("Database connection not available.")
+    from app.services import search_in_db as search_in_db_service_function
 
     search_queries, title_queries, description_queries = parsers.parse_queries(
         search_queries=search_queries,
@@ -1,6 +1,20 @@
-from app.models import ReprMode, SortBy, SortOrder
+from app.models import CacheMode, FetchEngine, ReplaySpeed, ReprMode, SortBy, SortOrder
 
 MAX_PAGES = 0
+ENGINE = FetchEngine.SELENIUM
+WORKERS = 1
+PARSE_WORKERS = 0
+CONCURRENCY = 0
+PIPELINE = True
+CACHE_MODE = CacheMode.OFF
+URL_FILTERS = False
+INCREMENTAL = False
+STREAM = False
+NDJSON = None
+ARCHIVE = None
+PARSE_CACHE = None
+REPLAY_SPEED = ReplaySpeed.FAST
+DAEMON = False
 
 MIN_PRICE = 0
 MAX_PRICE = 0
@@ -4,7 +4,7 @@ from typing import Annotated
 
 from typer import Argument, Option
 
-from app.models import ReprMode, SortBy, SortOrder
+from app.models import CacheMode, FetchEngine, ReplaySpeed, ReprMode, SortBy, SortOrder
 
 _SEARCH_QUERIES_HELP = "A query string(s) to search for a product with Avito search service"
 
@@ -56,6 +56,130 @@ MaxPages = Annotated[
         help="Maximum number of pages to scrape. Use '0' to scrape all pages.",
     ),
 ]
+Workers = Annotated[
+    int,
+    Option(
+        min=1,
+        help="Number of browser instances fetching pages of a search query at the same time.",
+    ),
+]
+Engine = Annotated[
+    FetchEngine,
+    Option(
+        case_sensitive=False,
+        help="Engine to fetch search pages with. 'httpx' engine falls back to 'selenium' on blocked pages.",
+    ),
+]
+ParseWorkers = Annotated[
+    int,
+    Option(
+        min=0,
+        help=(
+            "Number of processes parsing fetched cards on separate CPU cores. "
+            "Use '0' to parse cards in the main process."
+        ),
+    ),
+]
+Concurrency = Annotated[
+    int,
+    Option(
+        min=0,
+        help=(
+            "Run all search queries at once over async HTTP (with fallback to the browser on blocked pages), "
+            "keeping at most this number of page requests in flight. Use '0' to run queries one by one. "
+            "Pages are fetched with 'httpx' engine and parsed after fetching, "
+            "so it can not be combined with other engines, '--pipeline', '--stream' and '--daemon' options."
+        ),
+    ),
+]
+Pipeline = Annotated[
+    bool,
+    Option(
+        help="Parse fetched pages in background, while the browser is loading the next ones.",
+    ),
+]
+CacheMode = Annotated[
+    CacheMode,
+    Option(
+        case_sensitive=False,
+        help=(
+            "Use on-disk cache of search result pages: 'read' uses fresh cached pages, "
+            "'write' also stores fetched ones, 'refresh' ignores cached pages and stores fetched ones."
+        ),
+    ),
+]
+UrlFilters = Annotated[
+    bool,
+    Option(
+        help=(
+            "Pass price range and price sort order to Avito in the search URL, so fewer pages are fetched, "
+            "and stop paging after results sorted by price pass the price range. Avito filters listings "
+            "by their title prices only, so listings with matching prices in descriptions can be missed."
+        ),
+    ),
+]
+Incremental = Annotated[
+    bool,
+    Option(
+        help=(
+            "Search newest listings first and find only listings new or changed (in price) since the previous "
+            "incremental searches, stopping at the first page of already seen listings."
+        ),
+    ),
+]
+Stream = Annotated[
+    bool,
+    Option(
+        help=(
+            "Filter and write products to outputs page by page, keeping memory use flat for any number of pages. "
+            "Products are not sorted and stay in page order. Can not be combined with '--concurrency'."
+        ),
+    ),
+]
+Ndjson = Annotated[
+    Path | None,
+    Option(
+        dir_okay=False,
+        help="File to append found products to, one JSON object per line.",
+    ),
+]
+Archive = Annotated[
+    Path | None,
+    Option(
+        dir_okay=False,
+        help=(
+            "Archive of search pages. With 'replay' engine, pages are read from it, "
+            "otherwise all fetched pages are recorded into it with timing metadata."
+        ),
+    ),
+]
+ParseCache = Annotated[
+    Path | None,
+    Option(
+        dir_okay=False,
+        help=(
+            "File to keep parsed cards in between runs, so listings unchanged since previous runs "
+            "are not parsed again. Parsed cards are always reused within a run."
+        ),
+    ),
+]
+ReplaySpeed = Annotated[
+    ReplaySpeed,
+    Option(
+        case_sensitive=False,
+        help="Speed of 'replay' engine: 'original' keeps recorded fetch times, 'fast' returns pages at once.",
+    ),
+]
+Daemon = Annotated[
+    bool,
+    Option(
+        help=(
+            "Send search queries to a daemon started with 'run-daemon' command, that keeps browsers warm "
+            "between calls, instead of starting a browser. '--workers' is ignored, "
+            "and '--concurrency' can not be combined with it."
+        ),
+    ),
+]
 
 # Filter options ---------------------------------------------------------------
 MinPrice = Annotated[
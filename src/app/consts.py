@@ -1,13 +1,79 @@
 from enum import Enum, StrEnum
+from functools import cached_property
 from os import getenv
+from pathlib import Path
+from tempfile import gettempdir
 
 from app.utils import get_env_or_secret
 
 AVITO_URL = "https://www.avito.ru"
+AVITO_REGION = getenv("AVITO_PARSER_REGION", default="moskva")  # region part of search URLs
 
 RICH_COLORS = ("blue", "magenta", "cyan")
 
-SAFE_SLEEP_TIME = float(getenv("AVITO_PARSER_SAFE_SLEEP_TIME", default=1.0))
+SAFE_SLEEP_TIME = float(getenv("AVITO_PARSER_SAFE_SLEEP_TIME", default=1.0))  # target interval between requests
+MAX_SAFE_SLEEP_TIME = float(getenv("AVITO_PARSER_MAX_SAFE_SLEEP_TIME", default=30.0))  # interval limit on backoff
+
+PAGE_READINESS_TIMEOUT = float(getenv("AVITO_PARSER_PAGE_READINESS_TIMEOUT", default=10.0))
+
+
+class ExtractionMode(StrEnum):
+    ELEMENTS = "elements"  # outerHTML of every card is requested separately
+    PAGE_SOURCE = "page_source"  # page source is requested once and split into cards locally
+    SCRIPT = "script"  # outerHTML of all cards is returned by a single script call
+
+
+EXTRACTION_MODE = ExtractionMode(getenv("AVITO_PARSER_EXTRACTION_MODE", default=ExtractionMode.SCRIPT).lower())
+
+
+class HtmlParserEngine(StrEnum):
+    HTML_PARSER = "html.parser"  # pure-python parser from the standard library
+    LXML = "lxml"  # C-based parser, several times faster
+
+
+HTML_PARSER = HtmlParserEngine(getenv("AVITO_PARSER_HTML_PARSER", default=HtmlParserEngine.LXML).lower())
+
+
+class CardExtractor(StrEnum):
+    BS4 = "bs4"  # card is parsed into a BeautifulSoup tree (with HTML_PARSER), that is searched for every field
+    XPATH = "xpath"  # card is parsed into an lxml tree, and all fields are collected in a single pass over it
+
+
+CARD_EXTRACTOR = CardExtractor(getenv("AVITO_PARSER_CARD_EXTRACTOR", default=CardExtractor.XPATH).lower())
+
+
+class ResourceBlockingProfile(StrEnum):
+    NONE = "none"
+    STANDARD = "standard"  # images, fonts, media, analytics and ads
+    STRICT = "strict"  # everything from 'standard' and stylesheets
+
+
+RESOURCE_BLOCKING_PROFILE = ResourceBlockingProfile(
+    getenv("AVITO_PARSER_RESOURCE_BLOCKING", default=ResourceBlockingProfile.STANDARD).lower()
+)
+REPORT_TRAFFIC = getenv("AVITO_PARSER_REPORT_TRAFFIC", default="false").lower() in ("1", "true", "yes")
+
+DRIVER_CACHE_PATH = Path(
+    getenv("AVITO_PARSER_DRIVER_CACHE", default=Path.home() / ".cache" / "avito-prices-scraper" / "drivers.json")
+)
+OFFLINE = getenv("AVITO_PARSER_OFFLINE", default="false").lower() in ("1", "true", "yes")  # never download drivers
+
+PAGE_CACHE_DIR = Path(
+    getenv("AVITO_PARSER_PAGE_CACHE_DIR", default=Path.home() / ".cache" / "avito-prices-scraper" / "pages")
+)
+PAGE_CACHE_TTL = float(getenv("AVITO_PARSER_PAGE_CACHE_TTL", default=15 * 60))  # in seconds
+# in bytes, while the env var is in megabytes
+PAGE_CACHE_MAX_SIZE = int(getenv("AVITO_PARSER_PAGE_CACHE_MAX_SIZE", default=200)) * 1024 * 1024
+
+PARSE_CACHE_MAX_SIZE = int(getenv("AVITO_PARSER_PARSE_CACHE_MAX_SIZE", default=10_000))  # in parsed cards, 0 disables
+
+SEEN_ITEMS_DIR = Path(  # listings seen by searches in incremental mode
+    getenv("AVITO_PARSER_SEEN_ITEMS_DIR", default=Path.home() / ".cache" / "avito-prices-scraper" / "seen")
+)
+
+DAEMON_SOCKET_PATH = Path(
+    getenv("AVITO_PARSER_DAEMON_SOCKET", default=Path(gettempdir()) / "avito-prices-scraper.sock")
+)
 
 MONGO_USERNAME = get_env_or_secret("MONGO_USERNAME")
 MONGO_PASSWORD = get_env_or_secret("MONGO_PASSWORD")
@@ -23,6 +89,40 @@ class XPath(StrEnum):
     URL = '//a[@itemprop="url" and @data-marker="item-title"]'
 
 
+class SearchSort(StrEnum):  # values of 's' param of the search URL
+    PRICE_ASC = "1"
+    PRICE_DESC = "2"
+    DATE_DESC = "104"  # newest first
+
+
+class BlockedUrlPatterns(Enum):
+    IMAGES = ("*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*img.avito.st*")
+    FONTS = ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot")
+    MEDIA = ("*.mp4", "*.webm", "*.mp3", "*.ogg")
+    TRACKERS = (
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*mc.yandex.ru*",
+        "*an.yandex.ru*",
+        "*yandex.ru/ads*",
+        "*top-fwz1.mail.ru*",
+        "*ads.adfox.ru*",
+        "*criteo.com*",
+        "*stats.avito.ru*",
+    )
+    STYLESHEETS = ("*.css",)
+
+
+BLOCK_STATUS_CODES = frozenset({403, 429})
+# markers of the challenge page, that are looked for only in pages without cards,
+# as results pages can mention generic words (like 'captcha') in their scripts
+BLOCK_PAGE_MARKERS = (
+    "firewall-container",
+    "Доступ ограничен: проблема с IP",
+)
+
+
 class Symbols(Enum):
     RUB = (
         "₽",
@@ -60,7 +160,7 @@ class Symbols(Enum):
         "забронирована",
     )
 
-    @property
+    @cached_property
     def values(self) -> frozenset[str]:
         return frozenset(self.value) | frozenset({f" {symbol}" for symbol in self.value})
 
@@ -0,0 +1,44 @@
+import socket
+from pathlib import Path
+
+from app.consts import DAEMON_SOCKET_PATH
+from app.daemon.protocol import receive_message, send_message
+from app.db.serializers import dict_to_product, request_to_dict
+from app.models import CacheMode, FetchEngine, Product, ProductRequest
+
+
+def request_products_from_daemon(
+    request: ProductRequest,
+    *,
+    pipelined: bool,
+    engine: FetchEngine,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    socket_path: Path = DAEMON_SOCKET_PATH,
+) -> list[Product]:
+    """Scrape products with a running daemon, that keeps browsers warm between CLI calls."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise ConnectionError(f"Daemon is not running on {socket_path}. Start it with 'run-daemon' command.")
+
+        with sock.makefile("rwb") as file:
+            send_message(
+                file,
+                {
+                    "request": request_to_dict(request),
+                    "pipelined": pipelined,
+                    "engine": engine,
+                    "cache_mode": cache_mode,
+                    "url_filters": url_filters,
+                    "incremental": incremental,
+                },
+            )
+            response = receive_message(file)
+
+    if error := response.get("error"):
+        raise RuntimeError(f"Daemon failed to scrape products: {error}")
+
+    return [dict_to_product(product_dict) for product_dict in response["products"]]
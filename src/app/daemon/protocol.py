@@ -0,0 +1,17 @@
+import json
+from typing import Any, BinaryIO
+
+type Message = dict[str, Any]
+
+
+def send_message(file: BinaryIO, message: Message) -> None:
+    """Send a message as a single line of JSON."""
+    file.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+    file.flush()
+
+
+def receive_message(file: BinaryIO) -> Message:
+    """Receive a message sent with 'send_message'."""
+    if not (line := file.readline()):
+        raise ConnectionError("Connection closed before a message was received")
+    return json.loads(line)
@@ -0,0 +1,84 @@
+import os
+import socket
+from pathlib import Path
+from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+
+from rich import print
+
+from app.consts import DAEMON_SOCKET_PATH
+from app.daemon.protocol import receive_message, send_message
+from app.db.serializers import dict_to_request, product_to_dict
+from app.models import CacheMode, FetchEngine
+from app.scraper.driver import get_interface_pool
+from app.services import mark_items_seen, scrape_products
+
+
+class _RequestHandler(StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            message = receive_message(self.rfile)
+        except ConnectionError:  # e.g. a check if the daemon is running
+            return
+
+        request = dict_to_request(message["request"])
+        print(f"[bold]Daemon request:[/bold] {request.query.search_query}")
+
+        fetched_items: dict[str, dict[str, str]] = {}
+        try:
+            products = scrape_products(
+                request,
+                pipelined=message["pipelined"],
+                engine=FetchEngine(message["engine"]),
+                cache_mode=CacheMode(message["cache_mode"]),
+                url_filters=message.get("url_filters", False),
+                incremental=message.get("incremental", False),
+                fetched_items=fetched_items,
+            )
+        except Exception as e:
+            print(f"[bold red]Daemon request failed:[/bold red] {e!r}")
+            send_message(self.wfile, {"error": repr(e)})
+            return
+
+        send_message(self.wfile, {"products": [product_to_dict(product) for product in products]})
+        mark_items_seen(fetched_items)  # only once the client has got the products
+
+
+class _DaemonServer(ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _is_daemon_running(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def run_daemon(socket_path: Path = DAEMON_SOCKET_PATH) -> None:
+    """
+    Serve scraping requests on a unix socket until interrupted.
+    Browsers of the mounted interface pool are started at once and reused by all requests.
+    """
+    if _is_daemon_running(socket_path):
+        raise RuntimeError(f"Daemon is already running on {socket_path}")
+    socket_path.unlink(missing_ok=True)  # left after a killed daemon
+
+    get_interface_pool().warm_up()
+
+    # the socket is created private at once, as changing its mode after binding leaves a window for other users
+    old_umask = os.umask(0o077)
+    try:
+        server = _DaemonServer(str(socket_path), _RequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    with server:
+        print(f"[bold]Daemon is listening on[/bold] [bold green]{socket_path}[/bold green]")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[bold]Daemon stopped[/bold]")
+        finally:
+            socket_path.unlink(missing_ok=True)
@@ -1,3 +1,4 @@
+from functools import cache
 from typing import Literal
 
 from pymongo import ASCENDING, HASHED, MongoClient
@@ -55,5 +56,11 @@ _INDEXES_CONFIG: IndexesConfig = {
     ],
 }
 
-db = _initialize_db()
-_create_indexes_if_not_exist(indexes=_INDEXES_CONFIG, db=db)
+
+@cache
+def get_db() -> Db:
+    """Connect to the database and create missing indexes on the first call."""
+    db = _initialize_db()
+    _create_indexes_if_not_exist(indexes=_INDEXES_CONFIG, db=db)
+
+    return db
@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from datetime import datetime
 from typing import Iterable
 from uuid import uuid1
@@ -5,22 +6,35 @@ from uuid import uuid1
 from bson.objectid import ObjectId
 
 from app.db import serializers
-from app.db.config import db
+from app.db.config import get_db
 from app.models import DatetimeRange, Product, ProductRequest, Query
 
 
-def save_to_db(*, product_request: ProductRequest, products: Iterable[Product], timestamp: datetime = None) -> None:
-    """Save product request and products to the database."""
-    timestamp = timestamp or datetime.now().replace(second=0, microsecond=0)
+def save_request_to_db(*, product_request: ProductRequest, timestamp: datetime) -> str:
+    """Save product request to the database and return its ID."""
     request_id = uuid1().hex
 
     meta_params = {"timestamp": timestamp, "_id": request_id}
     request_dict = serializers.request_to_dict(product_request) | meta_params
-    db["requests"].insert_one(request_dict)
+    get_db()["requests"].insert_one(request_dict)
 
+    return request_id
+
+
+def save_products_to_db(*, request_id: str, products: Iterable[Product], timestamp: datetime) -> None:
+    """Save products of the saved product request to the database."""
     meta_params = {"timestamp": timestamp, "request_id": request_id}
     product_dicts = [serializers.product_to_dict(p) | meta_params for p in products]
-    db["products"].insert_many(product_dicts)
+    if product_dicts:
+        get_db()["products"].insert_many(product_dicts)
+
+
+def save_to_db(*, product_request: ProductRequest, products: Iterable[Product], timestamp: datetime = None) -> None:
+    """Save product request and products to the database."""
+    timestamp = timestamp or datetime.now().replace(second=0, microsecond=0)
+
+    request_id = save_request_to_db(product_request=product_request, timestamp=timestamp)
+    save_products_to_db(request_id=request_id, products=products, timestamp=timestamp)
 
 
 def get_requests_from_db(
@@ -48,13 +62,13 @@ def get_requests_from_db(
         if timestamp_conditions:
             query_dict["$or"] = query_dict.get("$or", []) + timestamp_conditions
 
-    requests = db["requests"].find(query_dict)
+    requests = get_db()["requests"].find(query_dict)
 
     return [serializers.dict_to_request(r) for r in requests], [str(r["_id"]) for r in requests]
 
 
 def get_products_from_db(request_id: str) -> list[Product]:
     """Get products from the database."""
-    products = db["products"].find({"request_id": request_id})
+    products = get_db()["products"].find({"request_id": request_id})
 
     return [serializers.dict_to_product(p) for p in products]
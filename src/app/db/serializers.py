@@ -5,6 +5,7 @@ from app.models import (
     DescriptionLine,
     FilterParams,
     Params,
+    ParsedStatus,
     Product,
     ProductRequest,
     Query,
@@ -49,10 +50,15 @@ def dict_to_request(request_dict: dict[str, Any]) -> ProductRequest:
 def dict_to_product(product_dict: dict[str, Any]) -> Product:
     d = product_dict.copy()
     for key in ("price", "price_status", "status"):
-        d.pop(key)
+        d.pop(key, None)
 
     price_statuses_zip = zip(d.pop("description_prices"), d.pop("parsed_statuses"))
-    d |= {"description_info": [DescriptionLine(price=price, status=status) for price, status in price_statuses_zip]}
+    d |= {
+        "description_info": [
+            DescriptionLine(price=price, status=ParsedStatus(status) if status else None)
+            for price, status in price_statuses_zip
+        ]
+    }
 
     return Product(**d)
 
@@ -66,6 +72,6 @@ def product_to_dict(product: Product) -> dict[str, Any]:
         "description_prices": [line.price for line in product.description_info],
         "parsed_statuses": [line.status for line in product.description_info],
     }
-    for key in ("price", "price_status", "status"):
+    for key in ("price", "unified_price", "price_status", "status", "description_info"):
         data.pop(key)
     return data
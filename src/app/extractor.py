@@ -0,0 +1,118 @@
+from typing import Callable, NamedTuple
+
+from app.consts import CARD_EXTRACTOR, HTML_PARSER, CardExtractor, HtmlParserEngine
+from base.bs4.interface import decompose_tree, parse_html
+from base.lxml.interface import parse_html_fragment
+
+_SKIPPED_DESCRIPTION_PREFIXES = ("<!-- -->", "Доставка")
+
+
+class CardFields(NamedTuple):
+    """Fields of a product card, that products are parsed from."""
+
+    item_id: str | None
+    title: str
+    href: str
+    description: str
+    title_price: int | None
+
+
+type _ExtractFunc = Callable[[str, HtmlParserEngine], CardFields | None]
+
+
+def _extract_card_fields_with_bs4(card_html: str, html_parser: HtmlParserEngine) -> CardFields | None:
+    card_element = parse_html(card_html, html_parser)
+    try:
+        # price block is present only in services (not product) cards
+        if card_element.find("div", {"data-marker": "price-lists-block"}):
+            return None
+
+        item_element = card_element.find(attrs={"data-item-id": True})
+        a_element = card_element.find("a", {"itemprop": "url", "data-marker": "item-title"})
+        description = next(
+            (
+                p.text
+                for p in card_element.find_all("p", attrs={"data-marker": False, "itemprop": False})
+                if not p.text.strip().startswith(_SKIPPED_DESCRIPTION_PREFIXES)
+            ),
+            "",
+        )
+        price_from_title = card_element.find("meta", {"itemprop": "price"})["content"]
+
+        return CardFields(
+            item_id=item_element["data-item-id"] if item_element else None,
+            title=a_element["title"],
+            href=a_element["href"],
+            description=description,
+            title_price=int(price_from_title) if price_from_title else None,
+        )
+    finally:
+        # parsed trees have reference cycles, so they are freed at once instead of waiting for the garbage collector
+        decompose_tree(card_element)
+
+
+def _extract_card_fields_with_xpath(card_html: str, html_parser: HtmlParserEngine) -> CardFields | None:
+    card_element = parse_html_fragment(card_html)  # always with lxml, so 'html_parser' is not used
+
+    item_id = card_element.get("data-item-id")
+    a_element, description, price_element = None, None, None
+    for element in card_element.iter("div", "a", "p", "meta"):
+        match element.tag:
+            case "div" if element.get("data-marker") == "price-lists-block":  # present only in services cards
+                return None
+            case "div" if item_id is None:
+                item_id = element.get("data-item-id")
+            case "a" if a_element is None:
+                if element.get("itemprop") == "url" and element.get("data-marker") == "item-title":
+                    a_element = element
+            case "p" if description is None:
+                if element.get("data-marker") is None and element.get("itemprop") is None:
+                    text = element.text_content()
+                    if not text.strip().startswith(_SKIPPED_DESCRIPTION_PREFIXES):
+                        description = text
+            case "meta" if price_element is None:
+                if element.get("itemprop") == "price":
+                    price_element = element
+
+    price_from_title = price_element.attrib["content"]
+
+    return CardFields(
+        item_id=item_id,
+        title=a_element.attrib["title"],
+        href=a_element.attrib["href"],
+        description=description or "",
+        title_price=int(price_from_title) if price_from_title else None,
+    )
+
+
+_EXTRACT_STRATEGIES_MAPPING: dict[CardExtractor, _ExtractFunc] = {
+    CardExtractor.BS4: _extract_card_fields_with_bs4,
+    CardExtractor.XPATH: _extract_card_fields_with_xpath,
+}
+
+
+def extract_card_fields(
+    card_html: str,
+    extractor: CardExtractor = CARD_EXTRACTOR,
+    html_parser: HtmlParserEngine = HTML_PARSER,
+) -> CardFields | None:
+    """
+    Extract fields of a product card from its HTML, or return None for a services card.
+    The 'bs4' extractor builds the tree with 'html_parser'.
+    """
+    try:
+        extract_func = _EXTRACT_STRATEGIES_MAPPING[extractor]
+    except KeyError:
+        raise ValueError(f"Unknown card extractor: {extractor}")
+
+    return extract_func(card_html, html_parser)
+
+
+def extract_item_id_and_price(card_html: str) -> tuple[str | None, int | None]:
+    """Extract item ID and price from title of any card (including services ones)."""
+    card_element = parse_html_fragment(card_html)
+
+    item_ids = card_element.xpath("descendant-or-self::*[@data-item-id][1]/@data-item-id")
+    prices = card_element.xpath('.//meta[@itemprop="price"][1]/@content')
+
+    return (item_ids[0] if item_ids else None), (int(prices[0]) if prices and prices[0] else None)
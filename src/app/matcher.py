@@ -0,0 +1,58 @@
+import re
+import string
+from dataclasses import dataclass
+from functools import cache
+
+from app.consts import BOOKED_SYMBOLS, NOT_RUB_SYMBOLS, RUB_SYMBOLS, SOLD_SYMBOLS
+from app.models import Query
+
+_PUNCTUATION_TRANSLATION = str.maketrans(string.punctuation, " " * len(string.punctuation))
+_SPACES_PATTERN = re.compile(r"\s+")
+
+
+def normalize(s: str) -> str:
+    s = s.translate(_PUNCTUATION_TRANSLATION)  # remove punctuation
+    s = _SPACES_PATTERN.sub(" ", s)  # remove extra spaces
+    return s.lower().strip()
+
+
+def tokenize(s: str) -> list[str]:
+    return normalize(s).split()
+
+
+def _join_symbols(symbols: frozenset[str]) -> str:
+    # alternation of literals is matched by the regex engine in one pass over the string for all symbols
+    return "|".join(re.escape(symbol) for symbol in sorted(symbols, key=len, reverse=True))
+
+
+SOLD_PATTERN = re.compile(_join_symbols(SOLD_SYMBOLS))
+BOOKED_PATTERN = re.compile(_join_symbols(BOOKED_SYMBOLS))
+
+# numbers with an optional unit right after them, non-rouble units are checked first
+PRICE_CANDIDATE_PATTERN = re.compile(
+    rf"(?P<number>\d+)(?:(?P<not_rub>{_join_symbols(NOT_RUB_SYMBOLS)})|(?P<rub>{_join_symbols(RUB_SYMBOLS)}))?"
+)
+
+
+@dataclass(slots=True, frozen=True)
+class QueryMatcher:
+    """Tokens of title and description queries, that are matched against normalized titles and description lines."""
+
+    title_tokens: tuple[str, ...]
+    description_tokens: tuple[str, ...]
+
+    def is_title_matched(self, title: str) -> bool:
+        normalized_title = normalize(title)
+        return all(token in normalized_title for token in self.title_tokens)
+
+    def is_line_matched(self, normalized_line: str) -> bool:
+        return all(token in normalized_line for token in self.description_tokens)
+
+
+@cache
+def get_query_matcher(query: Query) -> QueryMatcher:
+    """Get the matcher of the query, that is built once and reused for all its cards."""
+    return QueryMatcher(
+        title_tokens=tuple(tokenize(query.title_query or query.search_query)),
+        description_tokens=tuple(tokenize(query.description_query or query.search_query)),
+    )
@@ -18,6 +18,24 @@ class ReprMode(StrEnum):
     CSV = "csv"
 
 
+class FetchEngine(StrEnum):
+    SELENIUM = "selenium"
+    HTTPX = "httpx"  # falls back to selenium, when the page is blocked
+    REPLAY = "replay"  # pages recorded into an archive by another engine
+
+
+class ReplaySpeed(StrEnum):
+    ORIGINAL = "original"  # pages are returned after the time they were fetched in
+    FAST = "fast"  # pages are returned at once
+
+
+class CacheMode(StrEnum):
+    OFF = "off"
+    READ = "read"  # use cached pages, but do not store fetched ones
+    WRITE = "write"  # use cached pages and store fetched ones
+    REFRESH = "refresh"  # ignore cached pages and store fetched ones
+
+
 class SortBy(StrEnum):
     PRICE = "price"
     PAGE = "page"
@@ -120,36 +138,13 @@ class ProductStatus(StrEnum):
         return f"[{style}]{self.name}[/{style}]"
 
 
-class _ProductRepr:
-    def __init__(self, product: "Product"):
-        self.title = f"[bold]{product.title}[/bold]"
-        self.description = f"[dim]{product.description}[/dim]"
-        self.url = f"[u blue link={product.url}]{product.url}[/u blue link]"
-
-        self.title_price = f"[magenta]{product.title_price or 'N/A'}[/magenta]"
-        self.description_prices = ", ".join(f"[green4]{s or 'N/A'}[/green4]" for s in set(product.description_prices))
-        self.price = self._construct_price_repr(product)
-        self.is_query_in_title = "[b green]✔[/b green]" if product.is_query_in_title else "[b red]✘[/b red]"
-
-        self.parsed_statuses = ", ".join(s.repr for s in set(product.parsed_statuses))
-        self.status = product.status.repr
-
-    @staticmethod
-    def _construct_price_repr(product: "Product") -> str:
-        if product.price_status == PriceStatus.OK:
-            return f"[u b yellow]{product.price}[/u b yellow]"
-        if product.price_status == PriceStatus.MULTIPLE_FOUND:
-            return ", ".join(f"[b yellow]{s}[/b yellow]" for s in product.price)
-        return "[b]N/A[/b]"
-
-
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class DescriptionLine:
     price: int | None
     status: ParsedStatus
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class Product:
     title: str
     description: str
@@ -158,44 +153,28 @@ class Product:
     description_info: list[DescriptionLine]
     is_query_in_title: bool
 
-    repr: _ProductRepr = field(init=False)
+    # used by filters and sorters, so computed once, while markup for display is built by the presenter on demand
+    price: int | list[int] | None = field(init=False, repr=False, compare=False)
+    unified_price: int = field(init=False, repr=False, compare=False)  # price used for filtering and sorting
+    status: ProductStatus = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "repr", _ProductRepr(self))
+        price = self._get_price()
+        object.__setattr__(self, "price", price)
+        object.__setattr__(self, "unified_price", price[0] if isinstance(price, list) else (price or 0))
+        object.__setattr__(self, "status", self._get_status())
 
-    @cached_property
+    @property
     def description_prices(self) -> list[int]:
         """List of prices found in the description."""
         return [line.price for line in self.description_info if line.price]
 
-    @cached_property
+    @property
     def parsed_statuses(self) -> list[ParsedStatus]:
         """List of statuses found in the description."""
         return [line.status for line in self.description_info if line.status]
 
-    @cached_property
-    def _parsed_statuses_set(self) -> frozenset[ParsedStatus]:
-        return frozenset(self.parsed_statuses)
-
-    @cached_property
-    def _parsed_statuses_len(self) -> int:
-        return len(frozenset(self.parsed_statuses))
-
-    @cached_property
-    def price(self) -> int | list[int] | None:
-        price = None
-        if self.is_query_in_title:
-            price = self.title_price or self.description_prices
-        elif self.title_price:
-            price = self.title_price if self.title_price in self.description_prices else self.description_prices
-        return price[0] if (isinstance(price, list) and len(price) == 1) else (price or None)
-
-    @cached_property
-    def unified_price(self) -> int:
-        """Price used for filtering and sorting."""
-        return self.price[0] if isinstance(self.price, list) else (self.price or 0)
-
-    @cached_property
+    @property
     def price_status(self) -> PriceStatus:
         """Returns the status of the price."""
         if self.price is None:
@@ -204,17 +183,25 @@ class Product:
             return PriceStatus.MULTIPLE_FOUND
         return PriceStatus.OK
 
-    @cached_property
-    def status(self) -> ProductStatus:
-        """Returns the status of the product."""
-        if not self.parsed_statuses:
+    def _get_price(self) -> int | list[int] | None:
+        price = None
+        if self.is_query_in_title:
+            price = self.title_price or self.description_prices
+        elif self.title_price:
+            description_prices = self.description_prices
+            price = self.title_price if self.title_price in description_prices else description_prices
+        return price[0] if (isinstance(price, list) and len(price) == 1) else (price or None)
+
+    def _get_status(self) -> ProductStatus:
+        parsed_statuses = frozenset(self.parsed_statuses)
+        if not parsed_statuses:
             return ProductStatus(self.price_status)
 
-        if self._parsed_statuses_len > 1:
+        if len(parsed_statuses) > 1:
             return ProductStatus.AMBIGUOUS
-        if ParsedStatus.SOLD in self._parsed_statuses_set:
+        if ParsedStatus.SOLD in parsed_statuses:
             return ProductStatus.SOLD
-        if ParsedStatus.BOOKED in self._parsed_statuses_set:
+        if ParsedStatus.BOOKED in parsed_statuses:
             return ProductStatus.BOOKED
 
         return ProductStatus(self.price_status)
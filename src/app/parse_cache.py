@@ -0,0 +1,198 @@
+import gzip
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Generator, NamedTuple
+from uuid import uuid4
+
+from rich import print
+
+from app.consts import PARSE_CACHE_MAX_SIZE
+from app.db.serializers import dict_to_product, product_to_dict
+from app.matcher import get_query_matcher
+from app.models import Product, ProductRequest
+
+# parse settings of a request: title and description query tokens, min and max prices
+_RequestKey = tuple[tuple[str, ...], tuple[str, ...], int | None, int | None]
+_CacheKey = tuple[str, tuple[str, ...], tuple[str, ...], int | None, int | None]  # card hash and request key
+
+_MISSING = object()
+
+# bumped when cached products or keys change, so caches of other versions are discarded
+_FORMAT_VERSION = 1
+
+
+class ParseCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _hash_card(card_html: str) -> str:
+    return sha256(card_html.encode()).hexdigest()
+
+
+def _get_request_key(request: ProductRequest) -> _RequestKey:
+    # requests, which queries are normalized to the same tokens, share parsed cards
+    matcher, filter_params = get_query_matcher(request.query), request.params.filter_params
+    return matcher.title_tokens, matcher.description_tokens, filter_params.min_price, filter_params.max_price
+
+
+class ParseCache:
+    """
+    In-memory LRU cache of parsed cards, keyed by hash of card HTML and parse settings of the request
+    (its title and description queries and price range), so unchanged listings are not parsed again.
+    Services cards are cached as None. The cache can be saved to a gzipped JSON file and loaded back.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits, self.misses = 0, 0
+        self._entries: OrderedDict[_CacheKey, Product | None] = OrderedDict()
+        self._lock = Lock()  # pages are parsed in worker threads
+
+    def info(self) -> ParseCacheInfo:
+        return ParseCacheInfo(hits=self.hits, misses=self.misses, size=len(self._entries), max_size=self.max_size)
+
+    def parse_cards(
+        self,
+        card_htmls: list[str],
+        requests: list[ProductRequest],
+        parse: Callable[[list[str], list[ProductRequest]], list[list[Product | None]]],
+    ) -> list[list[Product | None]]:
+        """
+        Get parsed cards for each of the requests, parsing with 'parse' only cards not cached for some of them.
+        Products (or None for services cards) are returned in the order of cards.
+        """
+        card_hashes = [_hash_card(card_html) for card_html in card_htmls]
+        requests_keys = [_get_request_key(request) for request in requests]
+        requests_cards: list[list] = [[_MISSING] * len(card_htmls) for _ in requests]
+
+        is_missing = [False] * len(card_htmls)
+        with self._lock:
+            for cards, request_key in zip(requests_cards, requests_keys):
+                for i, card_hash in enumerate(card_hashes):
+                    key = (card_hash, *request_key)
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                        cards[i] = self._entries[key]
+                        self.hits += 1
+                    else:
+                        is_missing[i] = True
+                        self.misses += 1
+
+        missing_indices = [i for i, is_card_missing in enumerate(is_missing) if is_card_missing]
+        if not missing_indices:
+            return requests_cards
+
+        parsed_requests_cards = parse([card_htmls[i] for i in missing_indices], requests)
+
+        with self._lock:
+            for cards, request_key, parsed_cards in zip(requests_cards, requests_keys, parsed_requests_cards):
+                for i, product in zip(missing_indices, parsed_cards):
+                    if cards[i] is _MISSING:
+                        cards[i] = product
+                        self._put((card_hashes[i], *request_key), product)
+
+        return requests_cards
+
+    def _put(self, key: _CacheKey, product: Product | None) -> None:
+        self._entries[key] = product
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def load(self, path: Path) -> None:
+        """
+        Load cached cards from the file, if it exists, keeping the order of their last use.
+        Unreadable files and files of other format versions are skipped, and the cache starts empty.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, EOFError, ValueError) as e:
+            print(f"[yellow]Parse cache {path} is not readable, starting with an empty one: {e!r}[/yellow]")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+            print(f"[dim]Parse cache {path} is of another format version, starting with an empty one[/dim]")
+            return
+
+        try:
+            entries = [
+                (
+                    (card_hash, tuple(title_tokens), tuple(description_tokens), min_price, max_price),
+                    dict_to_product(product_dict) if product_dict is not None else None,
+                )
+                for card_hash, title_tokens, description_tokens, min_price, max_price, product_dict in data["entries"]
+            ]
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            print(f"[yellow]Parse cache {path} is malformed, starting with an empty one: {e!r}[/yellow]")
+            return
+
+        with self._lock:
+            for key, product in entries:
+                self._put(key, product)
+
+    def save(self, path: Path) -> None:
+        """Save cached cards to the file, least recently used first."""
+        with self._lock:
+            entries = [
+                [*key, product_to_dict(product) if product is not None else None]
+                for key, product in self._entries.items()
+            ]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            json.dump({"version": _FORMAT_VERSION, "entries": entries}, file, ensure_ascii=False)
+        temp_path.replace(path)
+
+
+_cache: ParseCache | None = None
+
+
+@contextmanager
+def mount_parse_cache(path: Path | None = None) -> Generator[None, None, None]:
+    """
+    Within the context, reuse parsed cards from the cache. When a path is provided, the cache is loaded from
+    the file and saved back on exit, so it is kept between runs. Hits and misses are reported on exit.
+    """
+    global _cache
+
+    if not PARSE_CACHE_MAX_SIZE:
+        yield
+        return
+
+    _cache = ParseCache(PARSE_CACHE_MAX_SIZE)
+    if path is not None:
+        _cache.load(path)
+
+    try:
+        yield
+    finally:
+        info = _cache.info()
+        if info.hits or info.misses:
+            print(
+                f"[dim]Parse cache: {info.hits} hits, {info.misses} misses "
+                f"({info.hit_rate:.0%} hit rate), {info.size} cards cached[/dim]"
+            )
+        if path is not None:
+            _cache.save(path)
+        _cache = None
+
+
+def get_parse_cache() -> ParseCache | None:
+    """Get the mounted cache, or None, when parsed cards are not cached."""
+    return _cache
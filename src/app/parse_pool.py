@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from math import ceil
+from multiprocessing import get_context
+from typing import Generator
+
+from app.extractor import extract_card_fields
+from app.matcher import get_query_matcher
+from app.models import Product, ProductRequest
+from app.parser import parse_product
+
+_MIN_CHUNK_SIZE = 10  # smaller chunks cost more in inter-process transfer than they save in parsing
+
+
+def parse_cards(card_htmls: list[str], requests: list[ProductRequest]) -> list[list[Product | None]]:
+    """
+    Parse the cards for each of the requests, returning products in the order of cards, and None for services cards.
+    Fields of every card are extracted once for all requests.
+    """
+    cards_fields = [extract_card_fields(card_html) for card_html in card_htmls]
+
+    requests_cards = []
+    for request in requests:
+        matcher, filter_params = get_query_matcher(request.query), request.params.filter_params
+        requests_cards.append(
+            [
+                parse_product(
+                    card_fields,
+                    matcher=matcher,
+                    min_price=filter_params.min_price,
+                    max_price=filter_params.max_price,
+                )
+                if card_fields is not None
+                else None
+                for card_fields in cards_fields
+            ]
+        )
+    return requests_cards
+
+
+class ParsePool:
+    """
+    Pool of processes parsing cards on all CPU cores. Raw card HTML is sent to workers in chunks,
+    and products are returned in the order of cards.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # workers are forked from a clean server process, not from the main one running browser threads
+        context = get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+    def parse_cards(self, card_htmls: list[str], requests: list[ProductRequest]) -> list[list[Product | None]]:
+        chunk_size = max(_MIN_CHUNK_SIZE, ceil(len(card_htmls) / self.workers))
+        chunks = [card_htmls[i : i + chunk_size] for i in range(0, len(card_htmls), chunk_size)]
+
+        requests_cards: list[list[Product | None]] = [[] for _ in requests]
+        for chunk_requests_cards in self._executor.map(parse_cards, chunks, repeat(requests)):
+            for cards, chunk_cards in zip(requests_cards, chunk_requests_cards):
+                cards.extend(chunk_cards)
+        return requests_cards
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+
+_pool: ParsePool | None = None
+
+
+@contextmanager
+def mount_parse_pool(workers: int) -> Generator[None, None, None]:
+    """Within the context, parse cards in a pool of 'workers' processes. With '0' workers, cards are parsed in place."""
+    global _pool
+
+    if not workers:
+        yield
+        return
+
+    _pool = ParsePool(workers)
+    try:
+        yield
+    finally:
+        _pool.close()
+        _pool = None
+
+
+def get_parse_pool() -> ParsePool | None:
+    """Get the mounted pool, or None, when cards are parsed in the calling process."""
+    return _pool
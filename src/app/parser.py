@@ -1,78 +1,52 @@
-import re
-import string
-
-from bs4 import BeautifulSoup
-
-from app.consts import AVITO_URL, Symbols
+from app.consts import AVITO_URL
+from app.extractor import CardFields
+from app.matcher import (
+    BOOKED_PATTERN,
+    PRICE_CANDIDATE_PATTERN,
+    SOLD_PATTERN,
+    QueryMatcher,
+    normalize,
+)
 from app.models import DescriptionLine, ParsedStatus, Product
 
 
-def is_product(card_element: BeautifulSoup) -> bool:
-    # try to find price block that is present only in services (not product) cards
-    return not card_element.find("div", {"data-marker": "price-lists-block"})
-
-
-def _normalize(s: str) -> str:
-    s = s.translate(str.maketrans(string.punctuation, " " * len(string.punctuation)))  # remove punctuation
-    s = re.sub(r"\s+", " ", s)  # remove extra spaces
-    return s.lower().strip()
-
-
-def _tokenize(s: str) -> list[str]:
-    return _normalize(s).split()
-
-
 def parse_product(
-    product_element: BeautifulSoup,
+    card_fields: CardFields,
     *,
-    title_query: str,
-    description_query: str,
+    matcher: QueryMatcher,
     min_price: int | None = None,
     max_price: int | None = None,
 ) -> Product:
-    a_element = product_element.find("a", {"itemprop": "url", "data-marker": "item-title"})
-
-    title = a_element["title"]
-    url = AVITO_URL + a_element["href"].split("?")[0]
-    description = next(
-        (
-            p.text
-            for p in product_element.find_all("p", attrs={"data-marker": False, "itemprop": False})
-            if not p.text.strip().startswith(("<!-- -->", "Доставка"))
-        ),
-        "",
-    )
-    price_from_title = product_element.find("meta", {"itemprop": "price"})["content"]
+    title, description = card_fields.title, card_fields.description
+    url = AVITO_URL + card_fields.href.split("?")[0]
 
     return Product(
         title=title,
         description=description,
         url=url,
-        title_price=int(price_from_title) if price_from_title else None,
+        title_price=card_fields.title_price,
         description_info=parse_description(
             description=description,
-            search_substr=description_query,
+            matcher=matcher,
             min_price=min_price,
             max_price=max_price,
         ),
-        is_query_in_title=all(t in _normalize(title) for t in _tokenize(title_query)),
+        is_query_in_title=matcher.is_title_matched(title),
     )
 
 
 def parse_description(
     description: str,
     *,
-    search_substr: str,
+    matcher: QueryMatcher,
     min_price: int | None = None,
     max_price: int | None = None,
 ) -> list[DescriptionLine]:
-    search_tokens = _tokenize(search_substr)
-
     parsed_lines = []
     for line in description.split("\n"):
-        normalized_line = _normalize(line)
+        normalized_line = normalize(line)
 
-        if not all(token in normalized_line for token in search_tokens):
+        if not matcher.is_line_matched(normalized_line):
             continue
 
         parsed_line = parse_description_line(
@@ -91,25 +65,19 @@ def parse_description_line(
     min_price: int | None = None,
     max_price: int | None = None,
 ) -> DescriptionLine:
-    price, maybe_price, is_now_parsing_price = "", "", False
-
-    for i, char in enumerate(line):
-        if char.isdigit():
-            price += char
-            is_now_parsing_price = True
-
-        elif is_now_parsing_price:
-            if any(symbol == line[i : i + len(symbol)] for symbol in Symbols.NOT_RUB.values):
-                price, is_now_parsing_price = "", False
-                continue
-            elif any(symbol == line[i : i + len(symbol)] for symbol in Symbols.RUB.values):
-                break
-            else:
-                maybe_price = price
-                price, is_now_parsing_price = "", False
-
-        else:
-            price, is_now_parsing_price = "", False
+    """
+    Find the price in the normalized line: the first number followed by a rouble symbol, or the number
+    at the end of the line, or else the last number without a unit. Numbers with non-rouble units are skipped.
+    """
+    price, maybe_price = "", ""
+
+    for match in PRICE_CANDIDATE_PATTERN.finditer(line):
+        number = match["number"]
+        if match["rub"] is not None or match.end("number") == len(line):
+            price = number
+            break
+        if match["not_rub"] is None:
+            maybe_price = number
 
     def validate_price(v: str | int | None) -> int | None:
         v = int(v) if v else None
@@ -119,16 +87,11 @@ def parse_description_line(
 
     price = validate_price(price) or validate_price(maybe_price)
 
-    status = next(
-        (
-            status
-            for status, symbols in {
-                ParsedStatus.SOLD: Symbols.SOLD.values,
-                ParsedStatus.BOOKED: Symbols.BOOKED.values,
-            }.items()
-            if any(sym in line for sym in symbols)
-        ),
-        ParsedStatus.OK if price else ParsedStatus.NOT_FOUND,
-    )
+    if SOLD_PATTERN.search(line):
+        status = ParsedStatus.SOLD
+    elif BOOKED_PATTERN.search(line):
+        status = ParsedStatus.BOOKED
+    else:
+        status = ParsedStatus.OK if price else ParsedStatus.NOT_FOUND
 
     return DescriptionLine(price=price, status=status)
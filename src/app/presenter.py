@@ -1,24 +1,47 @@
 import json
-from dataclasses import asdict
 from typing import Callable
 
 from rich import print, print_json
 from rich.console import Console
 from rich.table import Table
 
-from app.models import Product, ReprMode
+from app.db.serializers import product_to_dict
+from app.models import PriceStatus, Product, ReprMode
 
 _console = Console()
 
-type _PresentFunc = Callable[[list[Product]], None]
+type _PresentFunc = Callable[[list[Product], int], None]
 
 
-def _present_as_list(products: list[Product]) -> None:
-    for i, repr_ in enumerate([pr.repr for pr in products]):
+class _ProductRepr:
+    def __init__(self, product: Product):
+        self.title = f"[bold]{product.title}[/bold]"
+        self.description = f"[dim]{product.description}[/dim]"
+        self.url = f"[u blue link={product.url}]{product.url}[/u blue link]"
+
+        self.title_price = f"[magenta]{product.title_price or 'N/A'}[/magenta]"
+        self.description_prices = ", ".join(f"[green4]{s or 'N/A'}[/green4]" for s in set(product.description_prices))
+        self.price = self._construct_price_repr(product)
+        self.is_query_in_title = "[b green]✔[/b green]" if product.is_query_in_title else "[b red]✘[/b red]"
+
+        self.parsed_statuses = ", ".join(s.repr for s in set(product.parsed_statuses))
+        self.status = product.status.repr
+
+    @staticmethod
+    def _construct_price_repr(product: Product) -> str:
+        if product.price_status == PriceStatus.OK:
+            return f"[u b yellow]{product.price}[/u b yellow]"
+        if product.price_status == PriceStatus.MULTIPLE_FOUND:
+            return ", ".join(f"[b yellow]{s}[/b yellow]" for s in product.price)
+        return "[b]N/A[/b]"
+
+
+def _present_as_list(products: list[Product], start: int) -> None:
+    for i, repr_ in enumerate(map(_ProductRepr, products), start=start - 1):
         print(f"[bold dim]{i + 1}.[/bold dim] {repr_.price} руб.: {repr_.title} ({repr_.url})")
 
 
-def _present_as_table(products: list[Product]) -> None:
+def _present_as_table(products: list[Product], start: int) -> None:
     table = Table(header_style="bold", show_lines=True)
 
     table.add_column("№", justify="right", style="bold dim")
@@ -29,7 +52,7 @@ def _present_as_table(products: list[Product]) -> None:
     table.add_column("Statuses from description")
     table.add_column("Status")
 
-    for i, repr_ in enumerate([pr.repr for pr in products]):
+    for i, repr_ in enumerate(map(_ProductRepr, products), start=start - 1):
         table.add_row(
             f"{i + 1}",
             f"{repr_.is_query_in_title} {repr_.title}\n{repr_.url}",
@@ -43,29 +66,31 @@ def _present_as_table(products: list[Product]) -> None:
     _console.print(table)
 
 
-def _present_as_dataclass(products: list[Product]) -> None:
-    for i, product in enumerate(products):
+def _present_as_dataclass(products: list[Product], start: int) -> None:
+    for i, product in enumerate(products, start=start - 1):
         print(f"[bold]{i:3}.[/bold] ", end="")
         print(product)
 
 
-def _present_as_json(products: list[Product]) -> None:
-    json_repr = json.dumps([asdict(product) for product in products])  # noqa
+def _present_as_json(products: list[Product], start: int) -> None:
+    json_repr = json.dumps([product_to_dict(product) for product in products], ensure_ascii=False)
     print_json(json_repr, indent=4)
 
 
-def _present_as_csv(products: list[Product]) -> None:
-    print("title;url;photos_number;status;price;statuses;title_price;description_prices")
+def _present_as_csv(products: list[Product], start: int) -> None:
+    if start == 1:
+        print("title;url;status;price;statuses;title_price;description_prices")
     for pr in products:
-        (
+        row = (
             pr.title.replace(";", ","),
             pr.url,
-            pr.status,
+            pr.status.value,
             pr.price,
-            str(pr.parsed_statuses),
+            ", ".join(s.value for s in pr.parsed_statuses),
             pr.title_price,
-            str(pr.description_prices),
+            ", ".join(str(price) for price in pr.description_prices),
         )
+        _console.print(";".join(str(value) for value in row), markup=False, highlight=False, soft_wrap=True)
 
 
 _PRESENT_STRATEGIES_MAPPING: dict[ReprMode, _PresentFunc] = {
@@ -80,9 +105,14 @@ _PRESENT_STRATEGIES_MAPPING: dict[ReprMode, _PresentFunc] = {
 def present(products: list[Product], mode: ReprMode) -> None:
     print(f"Found {len(products)} products: " + "–" * 80)
 
+    present_batch(products, mode)
+
+
+def present_batch(products: list[Product], mode: ReprMode, *, start: int = 1) -> None:
+    """Present products without a header. 'start' is the number of the first product, when they are streamed."""
     try:
         present_func = _PRESENT_STRATEGIES_MAPPING[mode]
     except KeyError:
         raise ValueError(f"Unknown presentation mode: {mode}")
 
-    present_func(products)
+    present_func(products, start)
@@ -0,0 +1,122 @@
+import gzip
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Generator, NotRequired, TypedDict
+from urllib.parse import urlencode
+
+from app.models import ReplaySpeed
+from app.scraper.search import Search
+
+
+class ArchivedPage(TypedDict):
+    search_key: NotRequired[str]  # query with price range and sort order, missing in old archives
+    search_query: str
+    search_params: NotRequired[dict[str, str]]  # price range and sort order, missing in old archives
+    page_number: int
+    card_htmls: list[str]
+    fetch_time: float  # time in seconds the page was fetched in
+    recorded_at: float  # unix timestamp
+
+
+class PageRecorder:
+    """Recorder of fetched search pages into an archive (gzipped JSON lines), that can be replayed later."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(path, "at", encoding="utf-8")  # new records are appended to an existing archive
+
+    def record(self, search: Search, page_number: int, card_htmls: list[str], *, fetch_time: float) -> None:
+        page = ArchivedPage(
+            search_key=search.key,
+            search_query=search.query,
+            search_params=search.params,
+            page_number=page_number,
+            card_htmls=card_htmls,
+            fetch_time=fetch_time,
+            recorded_at=time(),
+        )
+        with self._lock:
+            self._file.write(json.dumps(page, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PageArchive:
+    """Pages recorded with 'PageRecorder'. The latest record is used, when a page was recorded several times."""
+
+    def __init__(self, path: Path, *, replay_speed: ReplaySpeed = ReplaySpeed.FAST) -> None:
+        if not path.exists():
+            raise FileNotFoundError(f"Archive not found: {path}")
+
+        self.path = path
+        self.replay_speed = replay_speed
+
+        self._pages: dict[tuple[str, int], ArchivedPage] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                page: ArchivedPage = json.loads(line)
+                search_key = page.get("search_key") or urlencode(
+                    {"q": page["search_query"], **page.get("search_params", {})}
+                )
+                self._pages[(search_key, page["page_number"])] = page
+
+    @property
+    def searches(self) -> list[Search]:
+        """Recorded searches (with their price ranges and sort orders) in the order of recording."""
+        return [Search.from_key(search_key) for search_key in dict.fromkeys(key for key, _ in self._pages)]
+
+    def get(self, search: Search, page_number: int) -> ArchivedPage | None:
+        return self._pages.get((search.key, page_number))
+
+
+_recorder: PageRecorder | None = None
+_archive: PageArchive | None = None
+
+
+@contextmanager
+def mount_page_archive(
+    path: Path | None,
+    *,
+    replay: bool,
+    replay_speed: ReplaySpeed = ReplaySpeed.FAST,
+) -> Generator[None, None, None]:
+    """Within the context, replay pages from the archive or record fetched pages into it (if a path is provided)."""
+    global _recorder, _archive
+
+    if path is None:
+        if replay:
+            raise ValueError("Archive path is required to replay pages")
+        yield
+        return
+
+    if replay:
+        _archive = PageArchive(path, replay_speed=replay_speed)
+    else:
+        _recorder = PageRecorder(path)
+
+    try:
+        yield
+    finally:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder, _archive = None, None
+
+
+def get_page_recorder() -> PageRecorder | None:
+    """Get the mounted recorder, or None, when fetched pages are not recorded."""
+    return _recorder
+
+
+def get_page_archive() -> PageArchive:
+    if _archive is None:
+        raise ValueError("Page archive is not mounted")
+
+    return _archive
@@ -0,0 +1,73 @@
+import gzip
+import json
+from hashlib import sha256
+from pathlib import Path
+from time import time
+from uuid import uuid4
+
+from app.consts import AVITO_REGION, PAGE_CACHE_DIR, PAGE_CACHE_MAX_SIZE, PAGE_CACHE_TTL
+
+
+class PageCache:
+    """
+    On-disk cache of search result pages, keyed by search (query and URL params), region and page number.
+
+    A page is stored as a gzipped JSON list of its cards HTML. Pages older than 'ttl' seconds are not used,
+    and the oldest pages are evicted, when the total size of the cache exceeds 'max_size' bytes.
+    """
+
+    def __init__(self, directory: Path, *, ttl: float, max_size: int, region: str) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self.region = region
+
+    def _get_path(self, search_key: str, page_number: int) -> Path:
+        key = sha256(f"{self.region}\n{search_key}\n{page_number}".encode()).hexdigest()
+        return self.directory / f"{key}.json.gz"
+
+    def get(self, search_key: str, page_number: int) -> list[str] | None:
+        """Get cards HTML of the page, or None if the page is not cached or expired."""
+        path = self._get_path(search_key, page_number)
+        try:
+            if time() - path.stat().st_mtime > self.ttl:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            return None
+
+    def put(self, search_key: str, page_number: int, card_htmls: list[str]) -> None:
+        """Store cards HTML of the page and evict old pages, if the cache has grown too big."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        path = self._get_path(search_key, page_number)
+        temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")  # pages can be written by several workers
+        with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+            json.dump(card_htmls, file, ensure_ascii=False)
+        temp_path.replace(path)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        now = time()
+        entries = []
+        for path in self.directory.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # evicted by another worker
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+
+page_cache = PageCache(PAGE_CACHE_DIR, ttl=PAGE_CACHE_TTL, max_size=PAGE_CACHE_MAX_SIZE, region=AVITO_REGION)
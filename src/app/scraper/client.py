@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from threading import Lock
+from typing import TYPE_CHECKING, Generator
+
+from fake_useragent import UserAgent
+from rich import print
+
+if TYPE_CHECKING:
+    from base.httpx.clients import HttpxAsyncClient, HttpxClient
+
+_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+
+def _get_client_params(max_connections: int) -> dict:
+    try:
+        from httpx import Limits, Timeout
+    except ImportError:
+        raise ImportError("HTTPX is not available. Install 'http-libs' extra or use 'selenium' engine.")
+
+    user_agent = UserAgent(browsers=["Chrome"], os=["Linux"], platforms=["desktop"])
+
+    return {
+        "http2": True,
+        "headers": _HEADERS | {"User-Agent": user_agent.random},
+        "follow_redirects": True,
+        "timeout": Timeout(10.0, connect=5.0),
+        "limits": Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        ),
+    }
+
+
+def _create_client() -> "HttpxClient":
+    from base.httpx.clients import HttpxClient
+
+    print("[bold]Creating HTTP client...[/bold]")
+    client = HttpxClient(**_get_client_params(max_connections=20))
+    print("[bold]HTTP client created![/bold]\n")
+
+    return client
+
+
+def create_async_client(max_connections: int) -> "HttpxAsyncClient":
+    """Create an async HTTP client. It is bound to the running event loop, so it is not shared globally."""
+    from base.httpx.clients import HttpxAsyncClient
+
+    return HttpxAsyncClient(**_get_client_params(max_connections=max_connections))
+
+
+_client: "HttpxClient | None" = None
+_client_lock = Lock()
+
+
+def get_client() -> "HttpxClient":
+    """Get the shared HTTP client, creating it on the first call. The client is safe to share between threads."""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = _create_client()
+
+    return _client
+
+
+def close_client() -> None:
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+@contextmanager
+def mount_client() -> Generator[None, None, None]:
+    """Close the shared HTTP client (if it was created) on exit from the context."""
+    try:
+        yield
+    finally:
+        close_client()
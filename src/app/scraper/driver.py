@@ -1,11 +1,45 @@
 import tempfile
+from contextlib import contextmanager, suppress
+from queue import Empty, Queue
+from threading import Lock
+from types import TracebackType
+from typing import Generator, Self
 
 from fake_useragent import UserAgent
 from rich import print
-
+from selenium.common.exceptions import WebDriverException
+
+from app.consts import (
+    DRIVER_CACHE_PATH,
+    OFFLINE,
+    PAGE_READINESS_TIMEOUT,
+    REPORT_TRAFFIC,
+    RESOURCE_BLOCKING_PROFILE,
+    BlockedUrlPatterns,
+    ResourceBlockingProfile,
+)
 from base.selenium.drivers import ChromeOptions, create_driver
 from base.selenium.interface import BrowserInterface
 
+_BLOCKED_URL_PATTERNS_MAPPING: dict[ResourceBlockingProfile, list[str]] = {
+    ResourceBlockingProfile.NONE: [],
+    ResourceBlockingProfile.STANDARD: [
+        *BlockedUrlPatterns.IMAGES.value,
+        *BlockedUrlPatterns.FONTS.value,
+        *BlockedUrlPatterns.MEDIA.value,
+        *BlockedUrlPatterns.TRACKERS.value,
+    ],
+    ResourceBlockingProfile.STRICT: [
+        *BlockedUrlPatterns.IMAGES.value,
+        *BlockedUrlPatterns.FONTS.value,
+        *BlockedUrlPatterns.MEDIA.value,
+        *BlockedUrlPatterns.TRACKERS.value,
+        *BlockedUrlPatterns.STYLESHEETS.value,
+    ],
+}
+
+_SCRIPT_TIMEOUT_MARGIN = 5.0  # in seconds, so async scripts waiting for pages time out by themselves first
+
 
 def _create_interface() -> BrowserInterface:
     print("[bold]Creating browser interface...[/bold]")
@@ -21,6 +55,8 @@ def _create_interface() -> BrowserInterface:
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument(f"--user-data-dir={tempfile.mkdtemp()}")
+    if REPORT_TRAFFIC:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
     print(f"  Options added:", end="")
     for i, argument in enumerate(options.arguments):
@@ -36,34 +72,145 @@ def _create_interface() -> BrowserInterface:
     print(" " * 21 + f"[bold green]--platforms={user_agent.platforms}[/bold green]")
 
     print("  Creating driver...")
-    driver = create_driver("undetected_chrome", options=options, user_agent=user_agent)
+    driver = create_driver(
+        "undetected_chrome",
+        options=options,
+        user_agent=user_agent,
+        driver_cache_path=DRIVER_CACHE_PATH,
+        offline=OFFLINE,
+    )
     print(f"  Driver created: [bold green]{driver.name}[/bold green]")
 
     driver.set_window_size(1920, 1080)
     print("  Window size set to [bold green]1920x1080[/bold green]")
 
     interface = BrowserInterface(webdriver=driver)
-    print("\n[bold]Browser interface created![/bold]\n")
-
-    return interface
-
 
-_interface: BrowserInterface | None = None
+    script_timeout = PAGE_READINESS_TIMEOUT + _SCRIPT_TIMEOUT_MARGIN
+    interface.set_script_timeout(script_timeout)
+    print(f"  Script timeout set to [bold green]{script_timeout:.0f} s[/bold green]")
 
+    if blocked_url_patterns := _BLOCKED_URL_PATTERNS_MAPPING[RESOURCE_BLOCKING_PROFILE]:
+        interface.block_urls(blocked_url_patterns)
+    print(
+        f"  Resources blocking profile: [bold green]{RESOURCE_BLOCKING_PROFILE}[/bold green] "
+        f"({len(blocked_url_patterns)} URL patterns)"
+    )
 
-def mount_interface() -> BrowserInterface:
-    global _interface
-
-    _interface = _create_interface()
-
-    return _interface
-
+    print("\n[bold]Browser interface created![/bold]\n")
 
-def get_interface(*, to_create_if_not_found: bool = True) -> BrowserInterface:
-    if (_interface is None) and to_create_if_not_found:
-        return mount_interface()
+    return interface
 
-    if _interface is None:
-        raise ValueError("Interface is not activated")
 
-    return _interface
+def _is_alive(interface: BrowserInterface) -> bool:
+    try:
+        interface.webdriver.current_url  # noqa
+    except WebDriverException:
+        return False
+    return True
+
+
+class InterfacePool:
+    """
+    Pool of browser interfaces, that lets several pages be fetched at the same time.
+    Interfaces are created lazily (one by one, as undetected-chrome patches its binary on start)
+    and each of them is used by a single thread at a time.
+    """
+
+    def __init__(self, size: int = 1) -> None:
+        if size < 1:
+            raise ValueError(f"Pool size should be positive, got: {size}")
+
+        self.size = size
+        self._interfaces: list[BrowserInterface] = []
+        self._idle_interfaces: Queue[BrowserInterface] = Queue()
+        self._creation_lock = Lock()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.quit()
+
+    def _take_interface(self) -> BrowserInterface:
+        while True:
+            try:
+                return self._idle_interfaces.get_nowait()
+            except Empty:
+                pass
+
+            with self._creation_lock:
+                if len(self._interfaces) < self.size:
+                    interface = _create_interface()
+                    self._interfaces.append(interface)
+                    return interface
+
+            try:  # wait for an idle interface, but re-check from time to time, as a crashed one can be discarded
+                return self._idle_interfaces.get(timeout=1.0)
+            except Empty:
+                continue
+
+    def _discard_interface(self, interface: BrowserInterface) -> None:
+        with self._creation_lock:
+            self._interfaces.remove(interface)
+        with suppress(WebDriverException):
+            interface.quit()
+
+    @contextmanager
+    def acquire(self) -> Generator[BrowserInterface, None, None]:
+        """
+        Take an idle interface (or create a new one) for exclusive use within the context.
+        If the browser has crashed within the context, the interface is discarded and replaced on demand.
+        """
+        interface = self._take_interface()
+        is_alive = True
+        try:
+            yield interface
+        except WebDriverException:
+            is_alive = _is_alive(interface)
+            raise
+        finally:
+            if is_alive:
+                self._idle_interfaces.put(interface)
+            else:
+                self._discard_interface(interface)
+
+    def warm_up(self) -> None:
+        """Create all interfaces of the pool beforehand."""
+        with self._creation_lock:
+            while len(self._interfaces) < self.size:
+                interface = _create_interface()
+                self._interfaces.append(interface)
+                self._idle_interfaces.put(interface)
+
+    def quit(self) -> None:
+        """Quit all created interfaces."""
+        for interface in self._interfaces:
+            interface.quit()
+        self._interfaces.clear()
+
+
+_pool: InterfacePool | None = None
+
+
+def mount_interface_pool(size: int = 1) -> InterfacePool:
+    global _pool
+
+    _pool = InterfacePool(size)
+
+    return _pool
+
+
+def get_interface_pool(*, to_create_if_not_found: bool = True) -> InterfacePool:
+    if (_pool is None) and to_create_if_not_found:
+        return mount_interface_pool()
+
+    if _pool is None:
+        raise ValueError("Interface pool is not activated")
+
+    return _pool
@@ -1,61 +1,484 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from time import sleep
-from urllib.parse import urlencode
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Callable, Iterator
 
-from bs4 import BeautifulSoup
 from rich import print
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.expected_conditions import element_attribute_to_include
 
-from app.consts import AVITO_URL, RICH_COLORS, SAFE_SLEEP_TIME, XPath
-from app.scraper.driver import get_interface
+from app.consts import (
+    BLOCK_PAGE_MARKERS,
+    BLOCK_STATUS_CODES,
+    EXTRACTION_MODE,
+    PAGE_READINESS_TIMEOUT,
+    REPORT_TRAFFIC,
+    RICH_COLORS,
+    ExtractionMode,
+    SearchSort,
+    XPath,
+)
+from app.extractor import extract_item_id_and_price
+from app.models import CacheMode, FetchEngine, ReplaySpeed
+from app.scraper.archive import get_page_archive, get_page_recorder
+from app.scraper.cache import page_cache
+from app.scraper.client import get_client
+from app.scraper.driver import get_interface_pool
+from app.scraper.limiter import rate_limiter
+from app.scraper.search import Search
+from app.scraper.seen import seen_items_store
+from base.lxml.interface import find_elements_by_xpath, get_outer_html
+from base.selenium.interface import BrowserInterface
+from base.selenium.types import NetworkTraffic
 
+if TYPE_CHECKING:
+    from httpx import Response
 
-def _get_avito_search_page(search_query: str, page_number: int) -> None:
-    interface = get_interface()
+    from base.httpx.clients import HttpxAsyncClient
 
-    interface.get(f"{AVITO_URL}/moskva?{urlencode({'q': search_query, 'p': page_number})}")
+type _ExtractFunc = Callable[[BrowserInterface], list[str]]
+type _FetchFunc = Callable[[Search, int, _FetchStats], list[str]]
 
+# page is ready, when cards have IDs and their titles have links
+_READY_PAGE_XPATHS = [f"{XPath.PRODUCTS}[@data-item-id]", f"{XPath.URL}[@href]"]
+
+_ASYNC_PAGES_BATCH_SIZE = 5  # pages of one query requested at once, when the number of pages is unknown
+
+
+class _FetchStats:
+    """Stats of pages fetched by one search, kept apart from other searches run at the same time."""
+
+    def __init__(self) -> None:
+        self.readiness_wait_times: list[float | None] = []  # wait time in seconds for each page or None on timeout
+        self.pages_traffic: list[NetworkTraffic] = []  # browser traffic for each page, when reporting is enabled
+
+
+def _get_avito_search_page(interface: BrowserInterface, search: Search, page_number: int, stats: _FetchStats) -> None:
+    rate_limiter.wait()
+
+    interface.get(search.get_url(page_number))
+
+    start_time, is_ready = perf_counter(), False
     with suppress(TimeoutException):
-        interface.wait_until(element_attribute_to_include(("xpath", XPath.PRODUCTS), "data-item-id"))
-        interface.wait_until(element_attribute_to_include(("xpath", XPath.URL), "href"))
+        is_ready = interface.wait_until_xpaths_are_present(_READY_PAGE_XPATHS, timeout=PAGE_READINESS_TIMEOUT)
+    stats.readiness_wait_times.append((perf_counter() - start_time) if is_ready else None)
+
+
+def _print_pages_summary(stats: _FetchStats) -> None:
+    if stats.readiness_wait_times:
+        _print_readiness_summary(stats.readiness_wait_times)
+    if stats.pages_traffic:
+        _print_traffic_summary(stats.pages_traffic)
+
+
+def _print_traffic_summary(pages_traffic: list[NetworkTraffic]) -> None:
+    pages_number = len(pages_traffic)
+    requests_number = sum(traffic.requests_number for traffic in pages_traffic)
+    blocked_requests_number = sum(traffic.blocked_requests_number for traffic in pages_traffic)
+    loaded_bytes = sum(traffic.loaded_bytes for traffic in pages_traffic)
+
+    print(
+        f"[dim]Browser traffic per page: {requests_number / pages_number:.1f} requests, "
+        f"{blocked_requests_number / pages_number:.1f} of them blocked (saved), "
+        f"{loaded_bytes / pages_number / 1024:.1f} KiB loaded[/dim]"
+    )
+
+
+def _print_readiness_summary(readiness_wait_times: list[float | None]) -> None:
+    wait_times = [t for t in readiness_wait_times if t is not None]
+    timeouts_number = len(readiness_wait_times) - len(wait_times)
+
+    summary = f"Page readiness waits: {len(wait_times)} resolved"
+    if wait_times:
+        summary += f" (avg {sum(wait_times) / len(wait_times):.3f} s, max {max(wait_times):.3f} s)"
+    summary += f", {timeouts_number} timed out"
+    print(f"[dim]{summary}[/dim]")
+
+
+def _extract_card_htmls_one_by_one(interface: BrowserInterface) -> list[str]:
+    return [element.get_attribute("outerHTML") for element in interface.find_elements_by("xpath", XPath.PRODUCTS)]
+
+
+def _extract_card_htmls_from_page_source(interface: BrowserInterface) -> list[str]:
+    return _split_card_htmls(interface.page_source)
+
+
+def _extract_card_htmls_with_script(interface: BrowserInterface) -> list[str]:
+    return interface.get_outer_htmls_by_xpath(XPath.PRODUCTS)
+
+
+_EXTRACT_STRATEGIES_MAPPING: dict[ExtractionMode, _ExtractFunc] = {
+    ExtractionMode.ELEMENTS: _extract_card_htmls_one_by_one,
+    ExtractionMode.PAGE_SOURCE: _extract_card_htmls_from_page_source,
+    ExtractionMode.SCRIPT: _extract_card_htmls_with_script,
+}
+
+
+def _get_card_htmls_with_selenium(search: Search, page_number: int, stats: _FetchStats) -> list[str]:
+    try:
+        extract_func = _EXTRACT_STRATEGIES_MAPPING[EXTRACTION_MODE]
+    except KeyError:
+        raise ValueError(f"Unknown extraction mode: {EXTRACTION_MODE}")
+
+    with get_interface_pool().acquire() as interface:
+        _get_avito_search_page(interface, search, page_number, stats)
+
+        card_htmls = extract_func(interface)
+
+        if REPORT_TRAFFIC:
+            stats.pages_traffic.append(interface.pop_network_traffic())
+
+        # only empty pages are checked, as it costs an additional round trip for the page source
+        if not card_htmls and _is_block_page(interface.page_source):
+            print("[dim](blocked)[/dim]", end=" ", flush=True)
+            rate_limiter.report_blocked()
+        else:
+            rate_limiter.report_ok()
+
+        return card_htmls
+
+
+def _is_block_page(html: str) -> bool:
+    """Whether a page without cards is the challenge page shown to blocked clients."""
+    return any(marker in html for marker in BLOCK_PAGE_MARKERS)
+
+
+def _split_card_htmls(html: str) -> list[str]:
+    return [get_outer_html(element) for element in find_elements_by_xpath(html, XPath.PRODUCTS)]
+
+
+def _get_card_htmls_from_response(response: "Response") -> list[str] | None:
+    """
+    Get cards HTML from a search page response, or None for a block page.
+    Other error responses are raised, as their pages have no cards and would end paging as the last page.
+    """
+    if response.status_code in BLOCK_STATUS_CODES:
+        return None
+
+    response.raise_for_status()
+
+    card_htmls = _split_card_htmls(response.text)
+    if not card_htmls and _is_block_page(response.text):
+        return None
+
+    return card_htmls
+
+
+def _get_card_htmls_with_httpx(search: Search, page_number: int, stats: _FetchStats) -> list[str]:
+    rate_limiter.wait()
+
+    response = get_client().get(search.get_url(page_number))
+
+    if (card_htmls := _get_card_htmls_from_response(response)) is None:
+        print("[dim](blocked, retrying in browser)[/dim]", end=" ", flush=True)
+        rate_limiter.report_blocked()
+        return _get_card_htmls_with_selenium(search, page_number, stats)
+
+    rate_limiter.report_ok()
 
-    sleep(SAFE_SLEEP_TIME)
+    return card_htmls
 
 
-def _get_card_elements_from_avito_search_page(search_query: str, page_number: int) -> list[BeautifulSoup]:
-    interface = get_interface()
+async def _get_card_htmls_with_httpx_async(
+    client: "HttpxAsyncClient",
+    search: Search,
+    page_number: int,
+    stats: _FetchStats,
+) -> list[str]:
+    await rate_limiter.wait_async()
 
-    _get_avito_search_page(search_query, page_number)
+    response = await client.get(search.get_url(page_number))
 
+    if (card_htmls := await asyncio.to_thread(_get_card_htmls_from_response, response)) is None:
+        rate_limiter.report_blocked()
+        return await asyncio.to_thread(_get_card_htmls_with_selenium, search, page_number, stats)
+
+    rate_limiter.report_ok()
+
+    return card_htmls
+
+
+def _get_card_htmls_from_archive(search: Search, page_number: int, stats: _FetchStats) -> list[str]:
+    archive = get_page_archive()
+
+    if (page := archive.get(search, page_number)) is None:
+        print("[dim](not recorded)[/dim]", end=" ", flush=True)
+        return []
+
+    if archive.replay_speed == ReplaySpeed.ORIGINAL:
+        sleep(page["fetch_time"])
+
+    return page["card_htmls"]
+
+
+_FETCH_STRATEGIES_MAPPING: dict[FetchEngine, _FetchFunc] = {
+    FetchEngine.SELENIUM: _get_card_htmls_with_selenium,
+    FetchEngine.HTTPX: _get_card_htmls_with_httpx,
+    FetchEngine.REPLAY: _get_card_htmls_from_archive,
+}
+
+
+def _record_card_htmls(
+    search: Search,
+    page_number: int,
+    card_htmls: list[str],
+    *,
+    fetch_time: float,
+) -> None:
+    if (recorder := get_page_recorder()) is not None:
+        recorder.record(search, page_number, card_htmls, fetch_time=fetch_time)
+
+
+def _get_cached_card_htmls(search: Search, page_number: int, cache_mode: CacheMode) -> list[str] | None:
+    if cache_mode not in (CacheMode.READ, CacheMode.WRITE):
+        return None
+    return page_cache.get(search.key, page_number)
+
+
+def _cache_card_htmls(
+    search: Search,
+    page_number: int,
+    card_htmls: list[str],
+    cache_mode: CacheMode,
+) -> None:
+    # empty pages are not cached, as they can be block pages as well as the end of search results
+    if card_htmls and cache_mode in (CacheMode.WRITE, CacheMode.REFRESH):
+        page_cache.put(search.key, page_number, card_htmls)
+
+
+def _get_page_card_htmls(
+    fetch_func: _FetchFunc,
+    search: Search,
+    page_number: int,
+    cache_mode: CacheMode,
+    stats: _FetchStats,
+) -> list[str]:
+    if (card_htmls := _get_cached_card_htmls(search, page_number, cache_mode)) is not None:
+        print("[dim](cached)[/dim]", end=" ", flush=True)
+        return card_htmls
+
+    start_time = perf_counter()
+    card_htmls = fetch_func(search, page_number, stats)
+    _record_card_htmls(search, page_number, card_htmls, fetch_time=perf_counter() - start_time)
+    _cache_card_htmls(search, page_number, card_htmls, cache_mode)
+
+    return card_htmls
+
+
+def _is_past_price_range(search: Search, card_htmls: list[str]) -> bool:
+    """Whether all cards of a page sorted by price are out of the price range, so the next pages are out of it too."""
+    if not (
+        (search.sort == SearchSort.PRICE_ASC and search.max_price)
+        or (search.sort == SearchSort.PRICE_DESC and search.min_price)
+    ):
+        return False
+
+    prices = [price for card_html in card_htmls if (price := extract_item_id_and_price(card_html)[1]) is not None]
+    if search.sort == SearchSort.PRICE_ASC:
+        return bool(prices) and min(prices) > search.max_price
+    return bool(prices) and max(prices) < search.min_price
+
+
+def _select_unseen_card_htmls(
+    card_htmls: list[str],
+    seen_items: dict[str, str],
+    search_items: dict[str, str],
+) -> tuple[list[str], bool]:
+    """
+    Select cards of listings, that are new or changed since they were seen, adding all listings to 'search_items'.
+    Also return whether all listings of the page were seen before.
+    """
+    unseen_card_htmls, is_seen_page = [], True
+    for card_html in card_htmls:
+        item_id, price = extract_item_id_and_price(card_html)
+        fingerprint = str(price)  # a listing is considered changed, when its price has changed
+        if item_id is None or item_id not in seen_items:
+            is_seen_page = False
+        if item_id is None or seen_items.get(item_id) != fingerprint:
+            unseen_card_htmls.append(card_html)
+        if item_id is not None:
+            search_items[item_id] = fingerprint
+    return unseen_card_htmls, is_seen_page
+
+
+def iter_card_htmls_from_avito_search(
+    search: Search,
+    max_pages: int,
+    *,
+    engine: FetchEngine = FetchEngine.SELENIUM,
+    cache_mode: CacheMode = CacheMode.OFF,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+) -> Iterator[list[str]]:
+    """
+    Yield cards HTML of the search results page by page.
+    Pages are fetched in batches by all workers of the pool and yielded in page order.
+    Depending on 'cache_mode', pages are taken from and stored to the on-disk page cache.
+    When the search is sorted by price, paging stops after the first page past its price range.
+    In incremental mode, only cards of listings new or changed since the previous searches are yielded,
+    and paging stops after the first page of seen listings (the search should be sorted newest first).
+    Listings of the fetched pages are added to 'fetched_items' by search key, and it is up to the caller
+    to mark them seen, once their products are delivered.
+    """
+    try:
+        fetch_func = _FETCH_STRATEGIES_MAPPING[engine]
+    except KeyError:
+        raise ValueError(f"Unknown fetch engine: {engine}")
+
+    print(f"Searching for [bold]<[yellow]{search.query}[/yellow]>[/bold] on Avito...")
+    if search.params:
+        print(f"[dim]Search URL params: {', '.join(f'{k}={v}' for k, v in search.params.items())}[/dim]")
+
+    print("Pages: ", end="", flush=True)
+
+    workers = get_interface_pool().size
+    stats = _FetchStats()
+    seen_items = seen_items_store.get(search.key) if incremental else {}
+    search_items = fetched_items.setdefault(search.key, {}) if fetched_items is not None else {}
+
+    # the marker of the last page replaces its label, unless something is printed after the label
+    page_number, page_label_length, stop_marker = 1, 0, None
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while stop_marker is None:
+            last_page_number = page_number + workers - 1
+            if max_pages:
+                last_page_number = min(last_page_number, max_pages)
+
+            futures = [
+                executor.submit(_get_page_card_htmls, fetch_func, search, batch_page_number, cache_mode, stats)
+                for batch_page_number in range(page_number, last_page_number + 1)
+            ]
+
+            for future in futures:
+                color = RICH_COLORS[(page_number - 1) % len(RICH_COLORS)]
+                print(f"[bold {color}]{page_number}...[/bold {color}]", end=" ", flush=True)
+                page_label_length = len(str(page_number)) + 4
+
+                if not (card_htmls := future.result()):
+                    stop_marker = f"[bold {color}]LAST![/bold {color}]"
+                    break
+
+                is_past_price_range = _is_past_price_range(search, card_htmls)
+
+                is_seen_page = False
+                if incremental:
+                    card_htmls, is_seen_page = _select_unseen_card_htmls(card_htmls, seen_items, search_items)
+                    print(f"[dim]({len(card_htmls)} new)[/dim]", end=" ", flush=True)
+                    page_label_length = 0
+
+                yield card_htmls
+
+                page_number += 1
+                if is_past_price_range:
+                    stop_marker = f"[bold {color}]PRICE![/bold {color}]"
+                elif is_seen_page:
+                    stop_marker = f"[bold {color}]SEEN![/bold {color}]"
+                elif max_pages and (page_number > max_pages):
+                    stop_marker = f"[bold {color}]MAX![/bold {color}]"
+                if stop_marker is not None:
+                    break
+
+            for rest_future in futures:
+                rest_future.cancel()
+
+    print(f"{'\b' * page_label_length}{stop_marker}\n")
+    _print_pages_summary(stats)
+
+
+def get_card_htmls_from_avito_search(
+    search: Search,
+    max_pages: int,
+    *,
+    engine: FetchEngine = FetchEngine.SELENIUM,
+    cache_mode: CacheMode = CacheMode.OFF,
+) -> list[str]:
+    """Get cards HTML from all pages of the search results."""
     return [
-        BeautifulSoup(element.get_attribute("outerHTML"), "html.parser")
-        for element in interface.find_elements_by("xpath", XPath.PRODUCTS)
+        card_html
+        for card_htmls in iter_card_htmls_from_avito_search(
+            search,
+            max_pages,
+            engine=engine,
+            cache_mode=cache_mode,
+        )
+        for card_html in card_htmls
     ]
 
 
-def get_card_elements_from_avito_search(search_query: str, max_pages: int) -> list[BeautifulSoup]:
-    print(f"Searching for [bold]<[yellow]{search_query}[/yellow]>[/bold] on Avito...")
+async def get_card_htmls_from_avito_search_async(
+    client: "HttpxAsyncClient",
+    search: Search,
+    max_pages: int,
+    *,
+    semaphore: asyncio.Semaphore,
+    cache_mode: CacheMode = CacheMode.OFF,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+) -> list[list[str]]:
+    """
+    Get cards HTML from all pages of the search results (page by page) with an async HTTP client.
+    Pages are requested in batches, that grow from a single page up to a few pages, while the semaphore limits
+    requests in flight across all queries. Paging stops at an empty page or a page shorter than the first one,
+    and pages scheduled after it are cancelled. When the search is sorted by price, paging also stops
+    at the first page past its price range. In incremental mode, only cards of new or changed listings
+    are returned, and paging also stops at the first page of seen listings. Listings of the fetched pages
+    are added to 'fetched_items' by search key, to be marked seen by the caller, once their products are delivered.
+    """
 
-    print("Pages: ", end="", flush=True)
+    async def get_page(page_number: int) -> list[str]:
+        card_htmls = await asyncio.to_thread(_get_cached_card_htmls, search, page_number, cache_mode)
+        if card_htmls is not None:
+            return card_htmls
+
+        async with semaphore:
+            start_time = perf_counter()
+            card_htmls = await _get_card_htmls_with_httpx_async(client, search, page_number, stats)
+            fetch_time = perf_counter() - start_time
+
+        await asyncio.to_thread(_record_card_htmls, search, page_number, card_htmls, fetch_time=fetch_time)
+        await asyncio.to_thread(_cache_card_htmls, search, page_number, card_htmls, cache_mode)
+        return card_htmls
 
-    page_number = 1
-    all_card_elements: list[BeautifulSoup] = []
-    while True:
-        color = RICH_COLORS[(page_number - 1) % len(RICH_COLORS)]
-        print(f"[bold {color}]{page_number}...[/bold {color}]", end=" ", flush=True)
+    stats = _FetchStats()
+    seen_items = await asyncio.to_thread(seen_items_store.get, search.key) if incremental else {}
+    search_items = fetched_items.setdefault(search.key, {}) if fetched_items is not None else {}
 
-        if not (card_elements := _get_card_elements_from_avito_search_page(search_query, page_number)):
-            number_of_chars_to_delete = len(str(page_number)) + 4
-            print(f"{'\b' * number_of_chars_to_delete}[bold {color}]LAST![/bold {color}]\n")
-            break
+    page_number, full_page_size, is_last_page_found = 1, 0, False
+    all_pages: list[list[str]] = []
+    while not is_last_page_found and not (max_pages and (page_number > max_pages)):
+        # batches grow with the number of found pages, so short searches do not request many pages past the last one
+        last_page_number = page_number + min(_ASYNC_PAGES_BATCH_SIZE, max(1, len(all_pages))) - 1
+        if max_pages:
+            last_page_number = min(last_page_number, max_pages)
 
-        all_card_elements.extend(card_elements)
+        tasks = [asyncio.create_task(get_page(n)) for n in range(page_number, last_page_number + 1)]
+        try:
+            for task in tasks:
+                card_htmls = await task
+                if not card_htmls:
+                    is_last_page_found = True
+                    break
+                page_number += 1
+                # all pages are as full as the first one, except the last one
+                full_page_size = full_page_size or len(card_htmls)
+                is_last_page_found = len(card_htmls) < full_page_size or _is_past_price_range(search, card_htmls)
+                if incremental:
+                    card_htmls, is_seen_page = _select_unseen_card_htmls(card_htmls, seen_items, search_items)
+                    is_last_page_found = is_last_page_found or is_seen_page
+                all_pages.append(card_htmls)
+                if is_last_page_found:
+                    break
+        finally:
+            # pages after the last one are not requested, unless their requests are already sent
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        page_number += 1
-        if max_pages and (page_number > max_pages):
-            number_of_chars_to_delete = len(str(page_number)) + 4
-            print(f"{'\b' * number_of_chars_to_delete}[bold {color}]MAX![/bold {color}]\n")
-            break
+    print(
+        f"Found [bold]{sum(len(card_htmls) for card_htmls in all_pages)}[/bold] "
+        f"{'new ' if incremental else ''}cards "
+        f"on [bold]{len(all_pages)}[/bold] pages for [bold]<[yellow]{search.query}[/yellow]>[/bold]"
+    )
+    _print_pages_summary(stats)  # of blocked pages fetched with the browser
 
-    return all_card_elements
+    return all_pages
@@ -0,0 +1,74 @@
+import asyncio
+from threading import Lock
+from time import monotonic, sleep
+
+from app.consts import MAX_SAFE_SLEEP_TIME, SAFE_SLEEP_TIME
+
+
+class RateLimiter:
+    """
+    Limiter of the request rate, shared by all workers and engines.
+
+    Every request reserves the next free time slot, so a request waits only for the time still left
+    since the previous one (nothing, if the previous page was loading long enough).
+    The interval between slots grows on block signals (even from the zero target one)
+    and recovers back to the target one on successful requests.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        max_interval: float,
+        backoff_factor: float = 2.0,
+        recovery_factor: float = 0.8,
+        min_backoff_interval: float = 1.0,
+    ) -> None:
+        self.target_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.backoff_factor = backoff_factor
+        self.min_backoff_interval = min_backoff_interval  # backoff starts from it, when the interval is shorter
+        self.recovery_factor = recovery_factor
+
+        self._interval = interval
+        self._next_slot_time = 0.0
+        self._lock = Lock()
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def _reserve_slot(self) -> float:
+        """Reserve the next free slot and return the time left until it."""
+        with self._lock:
+            now = monotonic()
+            slot_time = max(now, self._next_slot_time)
+            self._next_slot_time = slot_time + self._interval
+            return slot_time - now
+
+    def wait(self) -> None:
+        """Block until the next request is allowed."""
+        if (delay := self._reserve_slot()) > 0:
+            sleep(delay)
+
+    async def wait_async(self) -> None:
+        """Wait without blocking the event loop until the next request is allowed."""
+        if (delay := self._reserve_slot()) > 0:
+            await asyncio.sleep(delay)
+
+    def report_blocked(self) -> None:
+        """Slow down after a blocked request, pushing back already reserved slots as well."""
+        with self._lock:
+            self._interval = min(
+                max(self._interval, self.min_backoff_interval) * self.backoff_factor,
+                self.max_interval,
+            )
+            self._next_slot_time = max(self._next_slot_time, monotonic() + self._interval)
+
+    def report_ok(self) -> None:
+        """Speed up back towards the target interval after a successful request."""
+        with self._lock:
+            self._interval = max(self._interval * self.recovery_factor, self.target_interval)
+
+
+rate_limiter = RateLimiter(SAFE_SLEEP_TIME, max_interval=MAX_SAFE_SLEEP_TIME)
@@ -0,0 +1,96 @@
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode
+
+from app.consts import AVITO_REGION, AVITO_URL, SearchSort
+from app.models import ProductRequest, SortBy, SortOrder
+
+
+class Search(NamedTuple):
+    """Search query with price range and sort order, that are applied by Avito itself via the search URL."""
+
+    query: str
+    min_price: int | None = None
+    max_price: int | None = None
+    sort: SearchSort | None = None
+
+    @property
+    def params(self) -> dict[str, str]:
+        """Search URL params, except the query and the page number."""
+        params = {}
+        if self.min_price:
+            params["pmin"] = str(self.min_price)
+        if self.max_price:
+            params["pmax"] = str(self.max_price)
+        if self.sort:
+            params["s"] = str(self.sort)
+        return params
+
+    @property
+    def key(self) -> str:
+        """Search URL query string without the page number, that identifies pages of the search."""
+        return urlencode({"q": self.query, **self.params})
+
+    @classmethod
+    def from_key(cls, key: str) -> "Search":
+        """Build the search back from its key."""
+        params = dict(parse_qsl(key))
+        return cls(
+            params["q"],
+            min_price=int(params["pmin"]) if "pmin" in params else None,
+            max_price=int(params["pmax"]) if "pmax" in params else None,
+            sort=SearchSort(params["s"]) if "s" in params else None,
+        )
+
+    def get_url(self, page_number: int) -> str:
+        return f"{AVITO_URL}/{AVITO_REGION}?{urlencode({'q': self.query, **self.params, 'p': page_number})}"
+
+
+def build_search(request: ProductRequest, *, url_filters: bool = False, incremental: bool = False) -> Search:
+    """
+    Build a search for the request. With 'url_filters', its price range and price sort order are passed to Avito,
+    which filters and sorts listings by their title prices only. Incremental searches are sorted newest first.
+    """
+    if not (url_filters or incremental):
+        return Search(request.query.search_query)
+
+    filter_params, sort_params = request.params.filter_params, request.params.sort_params
+
+    sort = None
+    if incremental:
+        sort = SearchSort.DATE_DESC
+    elif sort_params.sort_by == SortBy.PRICE:
+        sort = SearchSort.PRICE_ASC if sort_params.sort_order == SortOrder.ASC else SearchSort.PRICE_DESC
+
+    if not url_filters:
+        return Search(request.query.search_query, sort=sort)
+
+    return Search(
+        request.query.search_query,
+        min_price=filter_params.min_price or None,
+        max_price=filter_params.max_price or None,
+        sort=sort,
+    )
+
+
+def group_requests_by_search(
+    requests: list[ProductRequest],
+    *,
+    url_filters: bool = False,
+    incremental: bool = False,
+) -> dict[Search, list[int]]:
+    """
+    Group requests (by their indices) by the search they need, so pages of each search are fetched once
+    for all requests, that differ in title and description queries or in params not passed to Avito.
+    Searches are ordered by their first request.
+    """
+    groups: dict[Search, list[int]] = {}
+    for i, request in enumerate(requests):
+        groups.setdefault(build_search(request, url_filters=url_filters, incremental=incremental), []).append(i)
+    return groups
+
+
+def get_max_pages(requests: list[ProductRequest]) -> int:
+    """Number of pages to fetch for all the requests, where '0' means all pages."""
+    if any(not request.params.max_pages for request in requests):
+        return 0
+    return max(request.params.max_pages for request in requests)
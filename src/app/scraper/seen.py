@@ -0,0 +1,44 @@
+import json
+from hashlib import sha256
+from pathlib import Path
+from uuid import uuid4
+
+from app.consts import AVITO_REGION, SEEN_ITEMS_DIR
+
+
+class SeenItemsStore:
+    """
+    On-disk store of listings seen by searches, keyed by search (query and URL params) and region.
+
+    Listings of a search are stored as a JSON object, that maps item IDs to their fingerprints,
+    so listings changed since they were seen can be told apart from unchanged ones.
+    """
+
+    def __init__(self, directory: Path, *, region: str) -> None:
+        self.directory = directory
+        self.region = region
+
+    def _get_path(self, search_key: str) -> Path:
+        key = sha256(f"{self.region}\n{search_key}".encode()).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def get(self, search_key: str) -> dict[str, str]:
+        """Get fingerprints of seen listings by their item IDs."""
+        try:
+            with self._get_path(search_key).open(encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def update(self, search_key: str, items: dict[str, str]) -> None:
+        """Add listings to seen ones, replacing fingerprints of listings seen before."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        path = self._get_path(search_key)
+        temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump(self.get(search_key) | items, file)
+        temp_path.replace(path)
+
+
+seen_items_store = SeenItemsStore(SEEN_ITEMS_DIR, region=AVITO_REGION)
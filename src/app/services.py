@@ -1,41 +1,302 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Iterable
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 from rich import print
 
 from app.filters import filter_products
-from app.models import DatetimeRange, Params, Product, ProductRequest, Query
-from app.parser import is_product, parse_product
+from app.models import (
+    CacheMode,
+    DatetimeRange,
+    FetchEngine,
+    Params,
+    Product,
+    ProductRequest,
+    Query,
+    SortBy,
+    SortOrder,
+)
 from app.presenter import present
-from app.scraper.getters import get_card_elements_from_avito_search
+from app.sinks import NdjsonSink, open_sinks
 from app.sorters import sort_products
 
+# Scraping subsystems (browser, HTTP client, HTML parser, asyncio) are heavy to import,
+# so they are imported in functions that use them, and commands working with the db only do not load them.
+if TYPE_CHECKING:
+    from app.scraper.search import Search
 
-def search_on_avito(request: ProductRequest, timestamp: datetime | None = None) -> list[Product]:
-    """Search for products on Avito and return them."""
-    query, params = request.query, request.params
 
-    card_elements = get_card_elements_from_avito_search(
-        search_query=query.search_query,
-        max_pages=params.max_pages,
+def _parse_card_htmls(card_htmls: list[str], requests: list[ProductRequest], page_number: int) -> list[list[Product]]:
+    """
+    Parse products of a page for each of the requests sharing its search, except ones with fewer 'max_pages'.
+    Cards are parsed in the mounted process pool, if there is one, and parsed cards are reused from the mounted cache.
+    """
+    from app.parse_cache import get_parse_cache
+    from app.parse_pool import get_parse_pool, parse_cards
+
+    is_page_requested = [
+        not request.params.max_pages or page_number <= request.params.max_pages for request in requests
+    ]
+    page_requests = [request for request, is_requested in zip(requests, is_page_requested) if is_requested]
+
+    pool, cache = get_parse_pool(), get_parse_cache()
+    parse = pool.parse_cards if pool is not None else parse_cards
+    if cache is not None:
+        page_requests_cards = cache.parse_cards(card_htmls, page_requests, parse=parse)
+    else:
+        page_requests_cards = parse(card_htmls, page_requests)
+
+    # services cards are skipped
+    page_requests_products = iter([[card for card in cards if card is not None] for cards in page_requests_cards])
+
+    return [next(page_requests_products) if is_requested else [] for is_requested in is_page_requested]
+
+
+def iter_grouped_products(
+    requests: list[ProductRequest],
+    *,
+    pipelined: bool,
+    engine: FetchEngine,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+    search: "Search | None" = None,
+) -> Iterator[list[list[Product]]]:
+    """
+    Fetch pages of the search shared by the requests once and parse products of each page for every request,
+    yielding them page by page as lists of products per request.
+    In pipelined mode, a page is parsed in a worker thread while the browser is loading the next one.
+    With 'url_filters', price range and sort order of the requests are passed to Avito in the search URL.
+    In 'incremental' mode, only listings new or changed since the previous searches are parsed, and listings
+    of the fetched pages are added to 'fetched_items', to be marked seen once their products are delivered.
+    Pages of 'search' are fetched, when it is given, instead of the search built for the first request.
+    """
+    from app.scraper.getters import iter_card_htmls_from_avito_search
+    from app.scraper.search import build_search, get_max_pages
+
+    pages = iter_card_htmls_from_avito_search(
+        search=search or build_search(requests[0], url_filters=url_filters, incremental=incremental),
+        max_pages=get_max_pages(requests),
+        engine=engine,
+        cache_mode=cache_mode,
+        incremental=incremental,
+        fetched_items=fetched_items,
+    )
+
+    if not pipelined:
+        for page_number, card_htmls in enumerate(pages, start=1):
+            yield _parse_card_htmls(card_htmls, requests, page_number)
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = None
+        for page_number, card_htmls in enumerate(pages, start=1):
+            next_future = executor.submit(_parse_card_htmls, card_htmls, requests, page_number)
+            if future is not None:
+                yield future.result()
+            future = next_future
+        if future is not None:
+            yield future.result()
+
+
+def iter_products(
+    request: ProductRequest,
+    *,
+    pipelined: bool,
+    engine: FetchEngine,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+) -> Iterator[list[Product]]:
+    """Fetch and parse products page by page, yielding products of each page."""
+    pages = iter_grouped_products(
+        [request],
+        pipelined=pipelined,
+        engine=engine,
+        cache_mode=cache_mode,
+        url_filters=url_filters,
+        incremental=incremental,
+        fetched_items=fetched_items,
+    )
+    for (products,) in pages:
+        yield products
+
+
+def scrape_products(
+    request: ProductRequest,
+    *,
+    pipelined: bool,
+    engine: FetchEngine,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+) -> list[Product]:
+    """Fetch and parse products from all pages."""
+    pages = iter_products(
+        request,
+        pipelined=pipelined,
+        engine=engine,
+        cache_mode=cache_mode,
+        url_filters=url_filters,
+        incremental=incremental,
+        fetched_items=fetched_items,
+    )
+    return [product for products in pages for product in products]
+
+
+def scrape_grouped_products(
+    requests: list[ProductRequest],
+    *,
+    pipelined: bool,
+    engine: FetchEngine,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    fetched_items: dict[str, dict[str, str]] | None = None,
+    search: "Search | None" = None,
+) -> list[list[Product]]:
+    """Fetch pages of the search shared by the requests once and parse products from all of them for each request."""
+    requests_products: list[list[Product]] = [[] for _ in requests]
+    pages = iter_grouped_products(
+        requests,
+        pipelined=pipelined,
+        engine=engine,
+        cache_mode=cache_mode,
+        url_filters=url_filters,
+        incremental=incremental,
+        fetched_items=fetched_items,
+        search=search,
     )
-    products = [
-        parse_product(
-            elem,
-            title_query=query.title_query or query.search_query,
-            description_query=query.description_query or query.search_query,
-            min_price=params.filter_params.min_price,
-            max_price=params.filter_params.max_price,
+    for page_requests_products in pages:
+        for products, page_products in zip(requests_products, page_requests_products):
+            products.extend(page_products)
+    return requests_products
+
+
+def search_on_avito(
+    request: ProductRequest,
+    timestamp: datetime | None = None,
+    *,
+    pipelined: bool = True,
+    engine: FetchEngine = FetchEngine.SELENIUM,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    via_daemon: bool = False,
+    ndjson_path: Path | None = None,
+) -> list[Product]:
+    """Search for products on Avito and return them. With 'via_daemon', products are scraped by a running daemon."""
+    from app.daemon.client import request_products_from_daemon
+
+    start_time = perf_counter()
+    fetched_items: dict[str, dict[str, str]] = {}
+    if via_daemon:
+        products = request_products_from_daemon(
+            request,
+            pipelined=pipelined,
+            engine=engine,
+            cache_mode=cache_mode,
+            url_filters=url_filters,
+            incremental=incremental,
         )
-        for elem in card_elements
-        if is_product(elem)
-    ]
+    else:
+        products = scrape_products(
+            request,
+            pipelined=pipelined,
+            engine=engine,
+            cache_mode=cache_mode,
+            url_filters=url_filters,
+            incremental=incremental,
+            fetched_items=fetched_items,
+        )
+    print(f"[dim]Scraped {len(products)} products in {perf_counter() - start_time:.2f} s[/dim]")
+
+    products = _handle_products(request, products, timestamp=timestamp, ndjson_path=ndjson_path)
+    mark_items_seen(fetched_items)
+    return products
+
+
+def search_on_avito_for_requests(
+    requests: list[ProductRequest],
+    timestamp: datetime | None = None,
+    *,
+    pipelined: bool = True,
+    engine: FetchEngine = FetchEngine.SELENIUM,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    ndjson_path: Path | None = None,
+) -> list[list[Product]]:
+    """
+    Search for products on Avito for all requests, fetching pages of each search once for all requests
+    with the same search query. Results are presented search by search, in the order of requests within each one.
+    """
+    from app.scraper.search import group_requests_by_search
+
+    requests_products: list[list[Product]] = [[] for _ in requests]
+
+    for request_indices in group_requests_by_search(
+        requests, url_filters=url_filters, incremental=incremental
+    ).values():
+        group_requests = [requests[i] for i in request_indices]
 
+        start_time = perf_counter()
+        fetched_items: dict[str, dict[str, str]] = {}
+        group_products = scrape_grouped_products(
+            group_requests,
+            pipelined=pipelined,
+            engine=engine,
+            cache_mode=cache_mode,
+            url_filters=url_filters,
+            incremental=incremental,
+            fetched_items=fetched_items,
+        )
+        print(
+            f"[dim]Scraped {sum(len(products) for products in group_products)} products "
+            f"for {len(group_requests)} request(s) in {perf_counter() - start_time:.2f} s[/dim]"
+        )
+
+        for i, request, products in zip(request_indices, group_requests, group_products):
+            requests_products[i] = _handle_products(request, products, timestamp=timestamp, ndjson_path=ndjson_path)
+        mark_items_seen(fetched_items)
+
+    return requests_products
+
+
+def mark_items_seen(fetched_items: dict[str, dict[str, str]]) -> None:
+    """
+    Save listings of incremental searches as seen. It is done after their products are delivered,
+    so listings of a failed run are reported again by the next one.
+    """
+    from app.scraper.seen import seen_items_store
+
+    for search_key, items in fetched_items.items():
+        seen_items_store.update(search_key, items)
+
+
+def _handle_products(
+    request: ProductRequest,
+    products: list[Product],
+    *,
+    timestamp: datetime | None,
+    ndjson_path: Path | None = None,
+) -> list[Product]:
+    """Filter, sort, present and save (if requested) scraped products."""
     products = filter_products(products, filter_params=request.params.filter_params)
     products = sort_products(products, sort_params=request.params.sort_params)
 
     present(products, mode=request.params.template)
 
+    if ndjson_path:
+        sink = NdjsonSink(ndjson_path)
+        sink.write(products)
+        sink.close()
+
     if request.params.save_to_db:
         timestamp = timestamp or datetime.now().replace(second=0, microsecond=0)
         try:
@@ -49,6 +310,137 @@ def search_on_avito(request: ProductRequest, timestamp: datetime | None = None)
     return products
 
 
+def stream_from_avito(
+    request: ProductRequest,
+    timestamp: datetime | None = None,
+    *,
+    pipelined: bool = True,
+    engine: FetchEngine = FetchEngine.SELENIUM,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    ndjson_path: Path | None = None,
+) -> int:
+    """
+    Search for products on Avito, filtering and writing them to sinks (presenter, NDJSON, db) page by page,
+    so memory use does not depend on the number of pages. Products are kept in page order, as sorting
+    would need all of them. Returns the number of written products.
+    """
+    sort_params = request.params.sort_params
+    if (sort_params.sort_by, sort_params.sort_order) != (SortBy.PAGE, SortOrder.ASC):
+        print("[dim]Products are not sorted in streaming mode, they are written in page order[/dim]")
+
+    start_time = perf_counter()
+    products_number = 0
+
+    fetched_items: dict[str, dict[str, str]] = {}
+    sinks = open_sinks(request, timestamp=timestamp, ndjson_path=ndjson_path)
+    try:
+        pages = iter_products(
+            request,
+            pipelined=pipelined,
+            engine=engine,
+            cache_mode=cache_mode,
+            url_filters=url_filters,
+            incremental=incremental,
+            fetched_items=fetched_items,
+        )
+        for products in pages:
+            products = filter_products(products, filter_params=request.params.filter_params)
+            for sink in sinks:
+                sink.write(products)
+            products_number += len(products)
+    finally:
+        for sink in sinks:
+            sink.close()
+    mark_items_seen(fetched_items)
+
+    print(f"[dim]Streamed {products_number} products in {perf_counter() - start_time:.2f} s[/dim]")
+
+    return products_number
+
+
+async def search_on_avito_async(
+    requests: list[ProductRequest],
+    timestamp: datetime | None = None,
+    *,
+    concurrency: int,
+    cache_mode: CacheMode = CacheMode.OFF,
+    url_filters: bool = False,
+    incremental: bool = False,
+    ndjson_path: Path | None = None,
+) -> list[list[Product]]:
+    """
+    Search for products on Avito for all requests concurrently with an async HTTP client.
+    Pages of each search are fetched once for all requests with the same search query.
+    At most 'concurrency' page requests are in flight at once. Blocked pages are fetched with the browser pool.
+    Results are presented in the order of requests. A failed search is reported, and its requests get no products,
+    while products of other searches are kept.
+    """
+    import asyncio
+
+    from app.scraper.client import create_async_client
+    from app.scraper.getters import get_card_htmls_from_avito_search_async
+    from app.scraper.search import get_max_pages, group_requests_by_search
+
+    start_time = perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    fetched_items: dict[str, dict[str, str]] = {}
+
+    async def scrape_grouped_products(search: "Search", group_requests: list[ProductRequest]) -> list[list[Product]]:
+        pages = await get_card_htmls_from_avito_search_async(
+            client,
+            search=search,
+            max_pages=get_max_pages(group_requests),
+            semaphore=semaphore,
+            cache_mode=cache_mode,
+            incremental=incremental,
+            fetched_items=fetched_items,
+        )
+
+        def parse_pages() -> list[list[Product]]:
+            group_products: list[list[Product]] = [[] for _ in group_requests]
+            for page_number, card_htmls in enumerate(pages, start=1):
+                page_requests_products = _parse_card_htmls(card_htmls, group_requests, page_number)
+                for products, page_products in zip(group_products, page_requests_products):
+                    products.extend(page_products)
+            return group_products
+
+        return await asyncio.to_thread(parse_pages)
+
+    groups = group_requests_by_search(requests, url_filters=url_filters, incremental=incremental)
+    async with create_async_client(max_connections=concurrency) as client:
+        # a failed search does not cancel the others
+        groups_products = await asyncio.gather(
+            *(scrape_grouped_products(search, [requests[i] for i in indices]) for search, indices in groups.items()),
+            return_exceptions=True,
+        )
+
+    requests_products: list[list[Product]] = [[] for _ in requests]
+    is_request_failed = [False] * len(requests)
+    for (search, request_indices), group_products in zip(groups.items(), groups_products):
+        if isinstance(group_products, BaseException):
+            if not isinstance(group_products, Exception):  # e.g. cancellation
+                raise group_products
+            print(f"[bold red]Search for <{search.query}> failed:[/bold red] {group_products!r}")
+            fetched_items.pop(search.key, None)  # so its listings are reported again by the next run
+            for i in request_indices:
+                is_request_failed[i] = True
+            continue
+        for i, products in zip(request_indices, group_products):
+            requests_products[i] = products
+
+    number_of_products = sum(len(products) for products in requests_products)
+    print(f"[dim]Scraped {number_of_products} products in {perf_counter() - start_time:.2f} s[/dim]")
+
+    requests_products = [
+        _handle_products(request, products, timestamp=timestamp, ndjson_path=ndjson_path) if not is_failed else []
+        for request, products, is_failed in zip(requests, requests_products, is_request_failed)
+    ]
+    await asyncio.to_thread(mark_items_seen, fetched_items)
+    return requests_products
+
+
 def search_in_db(
     *,
     queries: Iterable[Query] = None,
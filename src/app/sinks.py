@@ -0,0 +1,89 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Protocol
+
+from rich import print
+
+from app.db.serializers import product_to_dict
+from app.models import Product, ProductRequest, ReprMode
+from app.presenter import present_batch
+
+
+class ProductSink(Protocol):
+    """Destination of scraped products, that receives them batch by batch (e.g. page by page)."""
+
+    def write(self, products: list[Product]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class PresenterSink:
+    def __init__(self, mode: ReprMode) -> None:
+        self.mode = mode
+        self._products_number = 0
+
+    def write(self, products: list[Product]) -> None:
+        if not self._products_number:
+            print("Found products: " + "–" * 80)
+        present_batch(products, self.mode, start=self._products_number + 1)
+        self._products_number += len(products)
+
+    def close(self) -> None:
+        print(f"Found {self._products_number} products")
+
+
+class NdjsonSink:
+    """Writes products to a file as JSON lines."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = path.open("a", encoding="utf-8")
+
+    def write(self, products: list[Product]) -> None:
+        for product in products:
+            self._file.write(json.dumps(product_to_dict(product), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class DbSink:
+    """Saves the request on creation and its products on every write."""
+
+    def __init__(self, request: ProductRequest, *, timestamp: datetime) -> None:
+        from app.db.crud import save_request_to_db  # noqa
+
+        self.timestamp = timestamp
+        self.request_id = save_request_to_db(product_request=request, timestamp=timestamp)
+
+    def write(self, products: list[Product]) -> None:
+        from app.db.crud import save_products_to_db  # noqa
+
+        save_products_to_db(request_id=self.request_id, products=products, timestamp=self.timestamp)
+
+    def close(self) -> None:
+        print("Saved to db!")
+
+
+def open_sinks(
+    request: ProductRequest,
+    *,
+    timestamp: datetime | None,
+    ndjson_path: Path | None = None,
+) -> list[ProductSink]:
+    """Open sinks for products of the request, according to its params."""
+    sinks: list[ProductSink] = [PresenterSink(request.params.template)]
+
+    if ndjson_path:
+        sinks.append(NdjsonSink(ndjson_path))
+
+    if request.params.save_to_db:
+        timestamp = timestamp or datetime.now().replace(second=0, microsecond=0)
+        try:
+            sinks.append(DbSink(request, timestamp=timestamp))
+        except ImportError:
+            print("Database connection not available. Skipping saving to db.")
+
+    return sinks
@@ -1,5 +1,21 @@
-from bs4 import BeautifulSoup
+from typing import Literal
 
+from bs4 import BeautifulSoup, Tag
 
-def parse_html(html: str) -> BeautifulSoup:
-    return BeautifulSoup(html, "html.parser")
+type HtmlParser = Literal["html.parser", "lxml", "lxml-xml", "html5lib"]
+
+DEFAULT_HTML_PARSER: HtmlParser = "html.parser"
+
+
+def parse_html(html: str, parser: HtmlParser = DEFAULT_HTML_PARSER) -> BeautifulSoup:
+    return BeautifulSoup(html, parser)
+
+
+def decompose_tree(element: Tag) -> None:
+    """
+    Destroy the element with all its descendants, breaking their reference cycles, so the memory is freed at once.
+    Unlike 'decompose', works for BeautifulSoup objects too (their descendants are not linked to the root).
+    """
+    for child in list(element.contents):
+        child.decompose()
+    element.decompose()
@@ -4,6 +4,8 @@ from bs4 import BeautifulSoup
 from httpx import AsyncClient as HttpxAsyncClient
 from httpx import Client as HttpxClient
 
+from base.bs4.interface import DEFAULT_HTML_PARSER, HtmlParser, parse_html
+
 if TYPE_CHECKING:
     from ssl import SSLContext
 
@@ -26,10 +28,10 @@ if TYPE_CHECKING:
     )
 
 
-def parse_html_into_bs4(html: str) -> BeautifulSoup:
-    return BeautifulSoup(html, "html.parser")
+def parse_html_into_bs4(html: str, parser: HtmlParser = DEFAULT_HTML_PARSER) -> BeautifulSoup:
+    return parse_html(html, parser)
 
 
-def parse_response_into_bs4(response: Response) -> BeautifulSoup:
+def parse_response_into_bs4(response: "Response", parser: HtmlParser = DEFAULT_HTML_PARSER) -> BeautifulSoup:
     """Parse an HTTPx response into a BeautifulSoup object."""
-    return parse_html_into_bs4(response.text)
+    return parse_html_into_bs4(response.text, parser)
@@ -0,0 +1,15 @@
+from lxml.html import HtmlElement, document_fromstring, fragment_fromstring, tostring
+
+
+def parse_html_fragment(html: str) -> HtmlElement:
+    """Parse HTML of a single element (e.g. its outer HTML) into the element."""
+    return fragment_fromstring(html)
+
+
+def find_elements_by_xpath(html: str, xpath: str) -> list[HtmlElement]:
+    """Parse the HTML document and find all elements matching the XPath."""
+    return document_fromstring(html).xpath(xpath)
+
+
+def get_outer_html(element: HtmlElement) -> str:
+    return tostring(element, encoding="unicode", with_tail=False)
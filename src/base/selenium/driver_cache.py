@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+from typing import TypedDict
+
+
+class DriverCacheEntry(TypedDict):
+    executable_path: str
+    browser_version: str | None  # version of the browser, the driver was resolved for
+
+
+type DriverCache = dict[str, DriverCacheEntry]
+
+
+def read_driver_cache(cache_path: Path) -> DriverCache:
+    """Read resolved drivers from the cache file. Missing or broken file is treated as an empty cache."""
+    try:
+        with cache_path.open("r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_driver_cache(cache_path: Path, cache: DriverCache) -> None:
+    """Write resolved drivers to the cache file atomically."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = cache_path.with_suffix(f"{cache_path.suffix}.tmp")
+    with temp_path.open("w") as file:
+        json.dump(cache, file, indent=2)
+    temp_path.replace(cache_path)
+
+
+def get_major_version(version: str | None) -> str | None:
+    return version.split(".")[0] if version else None
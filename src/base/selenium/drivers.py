@@ -1,5 +1,6 @@
+from functools import partial
 from pathlib import Path
-from typing import Literal, TypedDict
+from typing import Callable, Literal, TypedDict
 
 from fake_useragent import UserAgent
 from selenium.webdriver import Chrome as ChromeDriver
@@ -22,11 +23,18 @@ from selenium.webdriver.ie.service import Service as IEService
 from undetected_chromedriver import Chrome as UndetectedChromeDriver
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.manager import DriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
 from webdriver_manager.firefox import GeckoDriverManager
 from webdriver_manager.microsoft import EdgeChromiumDriverManager, IEDriverManager
 from webdriver_manager.opera import OperaDriverManager
 
+from base.selenium.driver_cache import (
+    DriverCacheEntry,
+    get_major_version,
+    read_driver_cache,
+    write_driver_cache,
+)
+
 type SupportedBrowser = Literal[
     "chrome",
     "undetected_chrome",
@@ -42,7 +50,8 @@ type WebDriver = ChromeDriver | UndetectedChromeDriver | EdgeDriver | FirefoxDri
 
 
 class BrowserDriver(TypedDict):
-    manager_obj: DriverManager
+    manager_factory: Callable[[], DriverManager]  # managers are created on demand, as only one of them is used
+    browser_type: str | None  # type of browser for version detection, when supported by webdriver-manager
     driver_type: type[WebDriver]
     service_type: type[Service]
     options_type: type[Options]
@@ -50,49 +59,57 @@ class BrowserDriver(TypedDict):
 
 _BROWSER_PARAMS_MAP: dict[SupportedBrowser, BrowserDriver] = {
     "chrome": {
-        "manager_obj": ChromeDriverManager(),
+        "manager_factory": ChromeDriverManager,
+        "browser_type": ChromeType.GOOGLE,
         "driver_type": ChromeDriver,
         "service_type": ChromeService,
         "options_type": ChromeOptions,
     },
     "undetected_chrome": {
-        "manager_obj": ChromeDriverManager(chrome_type=ChromeType.GOOGLE),
+        "manager_factory": partial(ChromeDriverManager, chrome_type=ChromeType.GOOGLE),
+        "browser_type": ChromeType.GOOGLE,
         "driver_type": UndetectedChromeDriver,
         "service_type": ChromeService,
         "options_type": ChromeOptions,
     },
     "chromium": {
-        "manager_obj": ChromeDriverManager(chrome_type=ChromeType.CHROMIUM),
+        "manager_factory": partial(ChromeDriverManager, chrome_type=ChromeType.CHROMIUM),
+        "browser_type": ChromeType.CHROMIUM,
         "driver_type": ChromeDriver,
         "service_type": ChromeService,
         "options_type": ChromeOptions,
     },
     "brave": {
-        "manager_obj": ChromeDriverManager(chrome_type=ChromeType.BRAVE),
+        "manager_factory": partial(ChromeDriverManager, chrome_type=ChromeType.BRAVE),
+        "browser_type": ChromeType.BRAVE,
         "driver_type": ChromeDriver,
         "service_type": ChromeService,
         "options_type": ChromeOptions,
     },
     "edge": {
-        "manager_obj": EdgeChromiumDriverManager(),
+        "manager_factory": EdgeChromiumDriverManager,
+        "browser_type": ChromeType.MSEDGE,
         "driver_type": EdgeDriver,
         "service_type": EdgeService,
         "options_type": EdgeOptions,
     },
     "firefox": {
-        "manager_obj": GeckoDriverManager(),
+        "manager_factory": GeckoDriverManager,
+        "browser_type": "firefox",
         "driver_type": FirefoxDriver,
         "service_type": FirefoxService,
         "options_type": FirefoxOptions,
     },
     "ie": {
-        "manager_obj": IEDriverManager(),
+        "manager_factory": IEDriverManager,
+        "browser_type": None,
         "driver_type": IeDriver,
         "service_type": IEService,
         "options_type": IeOptions,
     },
     "opera": {
-        "manager_obj": OperaDriverManager(),
+        "manager_factory": OperaDriverManager,
+        "browser_type": None,
         "driver_type": RemoteDriver,
         "service_type": ChromeService,
         "options_type": ChromeOptions,
@@ -100,11 +117,50 @@ _BROWSER_PARAMS_MAP: dict[SupportedBrowser, BrowserDriver] = {
 }
 
 
-def _parse_executable_path[T: DriverManager](executable_path: Path | str | None, driver_manager: T) -> str:
-    if not executable_path:
-        executable_path = driver_manager.install()
+def _get_browser_version(browser_type: str | None) -> str | None:
+    """Get version of the installed browser locally, without network requests."""
+    if browser_type is None:
+        return None
+    return OperationSystemManager().get_browser_version_from_os(browser_type)
 
-    return str(executable_path)
+
+def _resolve_executable_path(
+    browser: SupportedBrowser,
+    browser_driver: BrowserDriver,
+    *,
+    cache_path: Path | None,
+    offline: bool,
+) -> str:
+    """
+    Resolve the driver binary path, reusing the one from the cache file while the browser major version is the same.
+    In offline mode the cached path is used as is, and the driver manager (which may go to network) is never called.
+    """
+    cache = read_driver_cache(cache_path) if cache_path else {}
+
+    if (entry := cache.get(browser)) and Path(entry["executable_path"]).is_file():
+        if offline:
+            return entry["executable_path"]
+
+        browser_version = _get_browser_version(browser_driver["browser_type"])
+        if get_major_version(browser_version) == get_major_version(entry["browser_version"]):
+            return entry["executable_path"]
+
+    if offline:
+        raise RuntimeError(
+            f"Driver for '{browser}' is not cached{f' in {cache_path}' if cache_path else ''} "
+            "and can not be downloaded in offline mode. Resolve it once with network access or pass executable path."
+        )
+
+    executable_path = browser_driver["manager_factory"]().install()
+
+    if cache_path:
+        cache[browser] = DriverCacheEntry(
+            executable_path=executable_path,
+            browser_version=_get_browser_version(browser_driver["browser_type"]),
+        )
+        write_driver_cache(cache_path, cache)
+
+    return executable_path
 
 
 def _parse_options[T: Options](options: list[str] | T | None, options_type: type[Options]) -> T:
@@ -139,26 +195,41 @@ def create_driver(
     options: list[str] | Options | None = None,
     user_agent: UserAgent | str | None = None,
     keep_alive: bool = True,
+    driver_cache_path: Path | None = None,
+    offline: bool = False,
 ) -> RemoteDriver:
-    """Create a Selenium WebDriver instance for the specified browser."""
+    """
+    Create a Selenium WebDriver instance for the specified browser.
+
+    When 'executable_path' is not provided, the driver is resolved with webdriver-manager.
+    Resolved path is kept in 'driver_cache_path' file (if provided) and reused by the next calls.
+    In 'offline' mode only the cached driver can be used.
+    """
     try:
         browser_driver = _BROWSER_PARAMS_MAP[browser]
     except KeyError:
         raise ValueError(f"Unsupported browser: {browser}")
 
-    driver_manager_obj = browser_driver["manager_obj"]
     driver_type = browser_driver["driver_type"]
     service_type = browser_driver["service_type"]
     options_type = browser_driver["options_type"]
 
-    executable_path = _parse_executable_path(executable_path, driver_manager_obj)
+    if executable_path:
+        executable_path = str(executable_path)
+    else:
+        executable_path = _resolve_executable_path(
+            browser,
+            browser_driver,
+            cache_path=driver_cache_path,
+            offline=offline,
+        )
     options = _parse_options(options=options, options_type=options_type)
 
     if user_agent:
         _add_user_agent(options=options, user_agent=user_agent)
 
     if browser == "undetected_chrome":
-        return driver_type(executable_path=executable_path, options=options, keep_alive=keep_alive)
+        return driver_type(driver_executable_path=executable_path, options=options, keep_alive=keep_alive)
 
     if browser == "opera":
         service = ChromeService(executable_path=executable_path)
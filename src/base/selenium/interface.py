@@ -1,3 +1,4 @@
+import json
 from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
 from types import TracebackType
@@ -36,8 +37,10 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.websocket_connection import WebSocketConnection
 
+from base.bs4.interface import DEFAULT_HTML_PARSER, HtmlParser, parse_html
 from base.selenium.drivers import SupportedBrowser, create_driver
-from base.selenium.waits import wait_until
+from base.selenium.types import NetworkTraffic
+from base.selenium.waits import wait_until, wait_until_xpaths_are_present
 
 
 class CookieData(TypedDict):
@@ -546,10 +549,24 @@ def _parse_str_to_by_enum(by: _By) -> By:
     return getattr(By, by.upper())
 
 
+_OUTER_HTMLS_BY_XPATH_SCRIPT = """
+const snapshot = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const outerHtmls = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    outerHtmls.push(snapshot.snapshotItem(i).outerHTML);
+}
+return outerHtmls;
+"""
+
+
 class BrowserInterface(BaseBrowserInterface):
-    def get_page_as_bs4(self) -> BeautifulSoup:
+    def get_page_as_bs4(self, parser: HtmlParser = DEFAULT_HTML_PARSER) -> BeautifulSoup:
         """Get the BeautifulSoup object of the current page source."""
-        return BeautifulSoup(self.page_source, "html.parser")
+        return parse_html(self.page_source, parser)
+
+    def get_outer_htmls_by_xpath(self, xpath: str) -> list[str]:
+        """Get outer HTML of all elements matching the XPath in a single WebDriver call."""
+        return self.execute_script(_OUTER_HTMLS_BY_XPATH_SCRIPT, xpath) or []
 
     def wait_until(
         self,
@@ -568,6 +585,38 @@ class BrowserInterface(BaseBrowserInterface):
             ignored_exceptions=ignored_exceptions,
         )
 
+    def block_urls(self, url_patterns: list[str]) -> None:
+        """Block network requests to URLs matching wildcard patterns (Chromium-based browsers only)."""
+        self.execute_cdp_cmd("Network.enable", {})
+        self.execute_cdp_cmd("Network.setBlockedURLs", {"urls": url_patterns})
+
+    def pop_network_traffic(self) -> NetworkTraffic:
+        """
+        Summarize network traffic since the previous call from the performance log.
+        The browser should be started with 'goog:loggingPrefs' capability set to {'performance': 'ALL'}.
+        """
+        requests_number, blocked_requests_number, loaded_bytes = 0, 0, 0
+        for entry in self.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            method, params = message["method"], message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                requests_number += 1
+            elif method == "Network.loadingFinished":
+                loaded_bytes += int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                blocked_requests_number += 1
+
+        return NetworkTraffic(
+            requests_number=requests_number,
+            blocked_requests_number=blocked_requests_number,
+            loaded_bytes=loaded_bytes,
+        )
+
+    def wait_until_xpaths_are_present(self, xpaths: list[str], *, timeout: float = 10) -> bool:
+        """Wait until every XPath matches a node, resolving on DOM mutations. Returns False on timeout."""
+        return wait_until_xpaths_are_present(self.webdriver, xpaths, timeout=timeout)
+
     def find_element_by(
         self,
         by: _By,
@@ -609,13 +658,11 @@ class BrowserInterface(BaseBrowserInterface):
         *,
         timeout_in_s: int | None = None,
         condition: Callable[[WebDriver], bool] | None = None,
+        parser: HtmlParser = DEFAULT_HTML_PARSER,
     ) -> BeautifulSoup:
         """Find an element by ID."""
         web_element = self.find_element_by(by, value, timeout_in_s=timeout_in_s, condition=condition)
-        return BeautifulSoup(
-            markup=web_element.get_attribute("outerHTML"),
-            features="html.parser",
-        )
+        return parse_html(web_element.get_attribute("outerHTML"), parser)
 
     def find_bs4_elements_by(
         self,
@@ -624,13 +671,8 @@ class BrowserInterface(BaseBrowserInterface):
         *,
         timeout_in_s: int | None = None,
         condition: Callable[[WebDriver], bool] | None = None,
+        parser: HtmlParser = DEFAULT_HTML_PARSER,
     ) -> list[BeautifulSoup]:
         """Find elements by ID."""
         web_elements = self.find_elements_by(by, value, timeout_in_s=timeout_in_s, condition=condition)
-        return [
-            BeautifulSoup(
-                markup=web_element.get_attribute("outerHTML"),
-                features="html.parser",
-            )
-            for web_element in web_elements
-        ]
+        return [parse_html(web_element.get_attribute("outerHTML"), parser) for web_element in web_elements]
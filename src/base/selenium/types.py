@@ -4,3 +4,9 @@ from typing import NamedTuple
 class Locator(NamedTuple):
     by: str
     value: str
+
+
+class NetworkTraffic(NamedTuple):
+    requests_number: int
+    blocked_requests_number: int
+    loaded_bytes: int
@@ -7,6 +7,31 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from base.selenium.types import Locator
 
+_WAIT_UNTIL_XPATHS_ARE_PRESENT_SCRIPT = """
+const [xpaths, timeoutInMs, done] = arguments;
+const isPresent = (xpath) => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue !== null;
+const areAllPresent = () => xpaths.every(isPresent);
+
+if (areAllPresent()) {
+    done(true);
+} else {
+    const observer = new MutationObserver(() => {
+        if (areAllPresent()) {
+            observer.disconnect();
+            clearTimeout(timer);
+            done(true);
+        }
+    });
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        done(false);
+    }, timeoutInMs);
+    observer.observe(document, {childList: true, subtree: true, attributes: true});
+}
+"""
+
 
 def wait_until(
     driver: WebDriver,
@@ -42,3 +67,13 @@ def wait_until_locator_is_clickable(
 ) -> None:
     wait = WebDriverWait(driver, timeout=timeout, poll_frequency=poll_frequency, ignored_exceptions=ignored_exceptions)
     wait.until(ec.element_to_be_clickable(locator))  # noqa
+
+
+def wait_until_xpaths_are_present(driver: WebDriver, xpaths: list[str], *, timeout: float = 10) -> bool:
+    """
+    Wait until every XPath matches at least one node, without polling:
+    a MutationObserver inside the page resolves as soon as the DOM satisfies all of them.
+    Returns False on timeout. The session script timeout (see 'set_script_timeout') should be longer than 'timeout',
+    or the wait is cut short by the driver raising TimeoutException.
+    """
+    return bool(driver.execute_async_script(_WAIT_UNTIL_XPATHS_ARE_PRESENT_SCRIPT, xpaths, int(timeout * 1000)))